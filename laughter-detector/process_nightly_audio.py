@@ -23,10 +23,9 @@ import argparse
 import asyncio
 import os
 import sys
-from datetime import datetime, timedelta, date
+from datetime import datetime, date
 from pathlib import Path
 from typing import List, Dict, Any
-import pytz
 
 # Add the src directory to the path so we can import our modules
 sys.path.append(str(Path(__file__).parent / "src"))
@@ -52,6 +51,12 @@ from src.services.limitless_keys import (
     fetch_decrypted_limitless_key,
 )
 from src.services.supabase_client import get_service_role_client
+from src.services.nightly_support import (
+    UTC,
+    TWO_DAYS,
+    ProcessingLogQueue,
+    yesterday_range,
+)
 
 # Load environment variables - check multiple locations (VPS uses /var/lib/giggles/.env)
 env_paths = [
@@ -100,6 +105,8 @@ class NightlyAudioProcessor:
         self.user_id_priority = {
             user_id: idx for idx, user_id in enumerate(self.include_user_ids)
         }
+        # processing_logs writes queued during the run, flushed in process_all_users()
+        self._log_writes = ProcessingLogQueue()
 
         print("🎭 Nightly Audio Processor initialized")
         print(f"📅 Processing Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -228,6 +235,8 @@ class NightlyAudioProcessor:
                     
                     continue
 
+            await self._log_writes.flush()
+
             print(f"\n🎉 Nightly processing complete!")
             print(
                 f"📊 Total: {total_users_processed} users processed successfully, {total_users_failed} failed"
@@ -238,6 +247,8 @@ class NightlyAudioProcessor:
             import traceback
 
             print(f"❌ Traceback: {traceback.format_exc()}")
+            # Still persist logs for users that finished before the failure
+            await self._log_writes.flush()
             raise
 
     async def _get_active_users(self) -> List[Dict[str, Any]]:
@@ -333,24 +344,14 @@ class NightlyAudioProcessor:
         user_id = user["user_id"]
         user_timezone = user.get("timezone", "UTC")
 
-        # TIMEZONE-AWARE PROCESSING: Calculate "yesterday" in user's timezone
-        # Example: If cron runs at 9 AM UTC and user is in PST (UTC-8):
-        # - UTC time: 9:00 AM Jan 15
-        # - PST time: 1:00 AM Jan 15 (previous day completed at midnight PST)
-        # - "Yesterday" for user: Jan 14, 2025 PST (00:00 → 23:59 PST)
-        user_tz = pytz.timezone(user_timezone)
-        now_in_user_tz = datetime.now(user_tz)
-        yesterday_in_user_tz = now_in_user_tz - timedelta(days=1)
-
-        # Calculate day boundaries in user's timezone
-        start_of_yesterday = yesterday_in_user_tz.replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-        end_of_yesterday = start_of_yesterday + timedelta(days=1)
-
-        # Convert to UTC for API calls (Limitless API uses UTC, database stores UTC)
-        start_of_yesterday_utc = start_of_yesterday.astimezone(pytz.UTC)
-        end_of_yesterday_utc = end_of_yesterday.astimezone(pytz.UTC)
+        # TIMEZONE-AWARE PROCESSING: Calculate "yesterday" in user's timezone,
+        # then convert to UTC for API calls (see yesterday_range())
+        (
+            start_of_yesterday,
+            end_of_yesterday,
+            start_of_yesterday_utc,
+            end_of_yesterday_utc,
+        ) = yesterday_range(user_timezone)
 
         print(f"📅 Processing yesterday for user in {user_timezone}:")
         print(f"   Local date: {start_of_yesterday.strftime('%Y-%m-%d')}")
@@ -412,8 +413,9 @@ class NightlyAudioProcessor:
                 # These will be excluded from orphan cleanup to prevent race condition
                 all_stored_clip_paths.update(chunk_clip_paths)
 
-            # Save processing log
-            await enhanced_logger.save_to_database(
+            # Save processing log (queued; flushed at the end of process_all_users)
+            self._log_writes.queue(
+                enhanced_logger,
                 "completed",
                 f"Nightly processing completed for {start_of_yesterday.date().isoformat()}",
             )
@@ -433,8 +435,9 @@ class NightlyAudioProcessor:
             # ALWAYS run orphan cleanup, even if processing failed
             # This ensures no orphaned files remain from crashed/failed processing
             try:
-                now_utc = datetime.utcnow()
-                start_window = now_utc - timedelta(days=2)
+                # Timezone-aware "now" (utcnow() is deprecated and returns a naive datetime)
+                now_utc = datetime.now(UTC)
+                start_window = now_utc - TWO_DAYS
                 # Get clip paths created in this session to exclude from cleanup
                 # CRITICAL FIX: Prevents race condition where cleanup deletes files
                 # that were just created but aren't visible in database query yet
@@ -28,6 +28,7 @@ TIMEZONE BEHAVIOR:
     This ensures complete deletion of all files/database entries for that local date.
 """
 
+import asyncio
 import sys
 import os
 from datetime import datetime, timedelta
@@ -58,6 +59,59 @@ from typing import Optional
 # (This import happens AFTER load_dotenv to ensure settings can initialize)
 from maintenance.manual_reprocess_yesterday import clear_database_records, clear_disk_files
 
+_UTC = pytz.UTC
+_ONE_DAY = timedelta(days=1)
+
+# Users are independent, so their deletes can overlap; cap it to bound disk IOPS
+MAX_CONCURRENT_USERS = 8
+
+
+def _clear_user_range(uid: str, start_utc: datetime, end_utc: datetime, supabase) -> None:
+    """
+    Delete one user's files and then database rows for a UTC range.
+
+    Runs in a worker thread: the reused clear_* helpers are async in name only
+    and block on the sync Supabase client, so they need their own event loop.
+    """
+    # CRITICAL ORDER: Delete files FIRST (while database records still exist)
+    asyncio.run(clear_disk_files(uid, start_utc, end_utc, supabase))
+    asyncio.run(clear_database_records(uid, start_utc, end_utc, supabase))
+
+
+async def _delete_user_date_data(
+    user: dict, target_date, target_date_str: str, supabase, semaphore: asyncio.Semaphore
+) -> None:
+    """
+    Delete one user's data for a local date, bounded by the shared semaphore.
+
+    Args:
+        user: User row with id and timezone
+        target_date: Date to delete (interpreted in the user's timezone)
+        target_date_str: Original date string, for log output
+        supabase: Shared Supabase client
+        semaphore: Limits how many users are cleaned up at once
+    """
+    uid = user['id']
+    user_timezone = user.get('timezone', 'UTC')
+
+    # TIMEZONE-AWARE: Calculate UTC range for this user's timezone
+    # This matches the logic in process_nightly_audio.py for calculating "yesterday"
+    user_tz = pytz.timezone(user_timezone)
+    start_of_day_local = user_tz.localize(datetime.combine(target_date, datetime.min.time()))
+    end_of_day_local = start_of_day_local + _ONE_DAY
+
+    # Convert to UTC for deletion (database stores all timestamps in UTC)
+    start_of_day_utc = start_of_day_local.astimezone(_UTC)
+    end_of_day_utc = end_of_day_local.astimezone(_UTC)
+
+    async with semaphore:
+        print(f"\n🔍 Processing user: {uid[:8]}... (timezone: {user_timezone})")
+        print(f"   Local date: {target_date_str} ({user_timezone})")
+        print(f"   UTC range: {start_of_day_utc.strftime('%Y-%m-%d %H:%M')} → {end_of_day_utc.strftime('%Y-%m-%d %H:%M')}")
+        await asyncio.to_thread(
+            _clear_user_range, uid, start_of_day_utc, end_of_day_utc, supabase
+        )
+
 
 async def delete_date_data(target_date_str: str, user_id: Optional[str] = None):
     """
@@ -73,8 +127,6 @@ async def delete_date_data(target_date_str: str, user_id: Optional[str] = None):
         user_id: Optional user ID to limit deletion (if None, deletes for all users)
     """
     try:
-        import asyncio
-        
         # Parse date
         target_date = datetime.strptime(target_date_str, '%Y-%m-%d').date()
         
@@ -107,34 +159,29 @@ async def delete_date_data(target_date_str: str, user_id: Optional[str] = None):
         print(f"      This matches how the cron job processes dates.\n")
         
         # REUSE EXISTING CODE: Use functions from manual_reprocess_yesterday.py
-        # CRITICAL ORDER: Delete files FIRST (while database records still exist)
-        # clear_disk_files() reads paths from database, then deletes files
-        for user in users:
-            uid = user['id']
-            user_timezone = user.get('timezone', 'UTC')
-            
-            print(f"\n🔍 Processing user: {uid[:8]}... (timezone: {user_timezone})")
-            
-            # TIMEZONE-AWARE: Calculate UTC range for this user's timezone
-            # This matches the logic in process_nightly_audio.py for calculating "yesterday"
-            user_tz = pytz.timezone(user_timezone)
-            start_of_day_local = user_tz.localize(datetime.combine(target_date, datetime.min.time()))
-            end_of_day_local = start_of_day_local + timedelta(days=1)
-            
-            # Convert to UTC for deletion (database stores all timestamps in UTC)
-            start_of_day_utc = start_of_day_local.astimezone(pytz.UTC)
-            end_of_day_utc = end_of_day_local.astimezone(pytz.UTC)
-            
-            print(f"   Local date: {target_date_str} ({user_timezone})")
-            print(f"   UTC range: {start_of_day_utc.strftime('%Y-%m-%d %H:%M')} → {end_of_day_utc.strftime('%Y-%m-%d %H:%M')}")
-            
-            # Clear disk files FIRST (reuses clear_disk_files from manual_reprocess_yesterday.py)
-            await clear_disk_files(uid, start_of_day_utc, end_of_day_utc, supabase)
-            
-            # Then clear database records (after files are deleted)
-            await clear_database_records(uid, start_of_day_utc, end_of_day_utc, supabase)
+        # Each user's cleanup is independent, so run them concurrently (bounded)
+        # while keeping the files-then-database order within each user
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_USERS)
+        results = await asyncio.gather(
+            *(
+                _delete_user_date_data(user, target_date, target_date_str, supabase, semaphore)
+                for user in users
+            ),
+            return_exceptions=True,
+        )
+        failures = [
+            (user['id'], result)
+            for user, result in zip(users, results)
+            if isinstance(result, Exception)
+        ]
+        for uid, error in failures:
+            print(f"❌ Cleanup failed for user {uid[:8]}...: {error}")
         
         print(f"\n{'='*60}")
+        if failures:
+            print(f"⚠️  Cleanup for {target_date_str} finished with {len(failures)} failed user(s)")
+            print(f"{'='*60}")
+            sys.exit(1)
         print(f"✅ Cleanup Complete for {target_date_str}")
         print(f"{'='*60}")
         
@@ -146,8 +193,6 @@ async def delete_date_data(target_date_str: str, user_id: Optional[str] = None):
 
 
 if __name__ == "__main__":
-    import asyncio
-    
     if len(sys.argv) < 2:
         print("Usage: python cleanup_date_data.py YYYY-MM-DD [user_id]")
         print("Example: python cleanup_date_data.py 2025-11-03")
@@ -11,15 +11,34 @@ SECURITY: This script only removes duplicate data - it preserves user data integ
 import os
 import sys
 import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import groupby
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
+# Add project root to path so the shared src.utils helpers can be imported
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.timestamp_utils import parse_epoch_seconds
+
 # Load environment variables
 load_dotenv()
 
+# Max ids per .in_() delete (keeps the PostgREST request URL under size limits)
+DELETE_BATCH_SIZE = 500
+
+# Users are cleaned up in parallel; capped to respect Supabase connection limits
+MAX_CLEANUP_WORKERS = 8
+
+# Only the audio_segments columns the overlap/priority logic reads
+SEGMENT_COLUMNS = "id,start_time,end_time,processed,created_at"
+
+
 class ImprovedDuplicateSegmentCleaner:
     def __init__(self):
         """Initialize the cleaner with Supabase connection."""
@@ -31,6 +50,11 @@ class ImprovedDuplicateSegmentCleaner:
             sys.exit(1)
         
         self.supabase = create_client(self.supabase_url, self.supabase_service_key)
+        # audio_segment_id -> laughter detection count, filled by _fetch_laughter_counts()
+        self._laughter_counts: Dict[str, int] = {}
+        self._laughter_counts_loaded = False
+        # Per-segment counts queried when the bulk fetch failed (memoized)
+        self._laughter_cache: Dict[str, int] = {}
         
         print("🧹 Giggles Improved Duplicate Segments Cleaner")
         print("=" * 50)
@@ -38,71 +62,163 @@ class ImprovedDuplicateSegmentCleaner:
         print("🎯 PRIORITY: Preserving segments with laughter detections")
         print()
 
-    def get_segment_laughter_count(self, segment_id: str) -> int:
-        """Get the number of laughter detections for a segment."""
+    def _fetch_paginated(self, build_query: Callable) -> List[Dict]:
+        """
+        Fetch every row of a query, one page at a time.
+
+        Args:
+            build_query: Returns a fresh (unexecuted) query builder for each page
+
+        Returns:
+            All rows across pages
+        """
+        # Fetch with pagination (Supabase limits to 1000 by default)
+        # REUSES PATTERN: Same pagination logic as src/api/data_routes.py get_daily_summary()
+        offset = 0
+        page_size = 1000
+        rows: List[Dict] = []
+        while True:
+            result = build_query().range(offset, offset + page_size - 1).execute()
+            if not result.data:
+                break
+            rows.extend(result.data)
+            if len(result.data) < page_size:
+                break
+            offset += page_size
+        return rows
+
+    def _fetch_laughter_counts(self, user_id: Optional[str] = None) -> None:
+        """
+        Load laughter detection counts per audio segment in one paginated pass.
+
+        Replaces one count query per segment with a fetch of audio_segment_id
+        values, counted client-side.
+
+        Args:
+            user_id: Limit to one user's detections (None loads every user's)
+        """
+        def build_query():
+            query = self.supabase.table("laughter_detections").select("audio_segment_id")
+            if user_id:
+                query = query.eq("user_id", user_id)
+            return query.order("id")
+
+        try:
+            rows = self._fetch_paginated(build_query)
+        except Exception as e:
+            print(f"Warning: Could not get laughter counts, falling back to per-segment queries: {str(e)}")
+            self._laughter_counts = {}
+            self._laughter_counts_loaded = False
+            return
+        self._laughter_counts = dict(Counter(row["audio_segment_id"] for row in rows))
+        self._laughter_counts_loaded = True
+
+    def get_segment_laughter_count(self, segment_id: str, log: Optional[List[str]] = None) -> int:
+        """
+        Get the number of laughter detections for a segment.
+
+        Reads the bulk-fetched counts; if that fetch failed, queries this segment
+        once and memoizes the result.
+
+        Args:
+            segment_id: Segment to count detections for
+            log: Collects output lines instead of printing them (see _cleanup_user)
+        """
+        if self._laughter_counts_loaded:
+            return self._laughter_counts.get(segment_id, 0)
+        if segment_id in self._laughter_cache:
+            return self._laughter_cache[segment_id]
         try:
             result = self.supabase.table("laughter_detections").select("id", count="exact").eq("audio_segment_id", segment_id).execute()
-            return result.count
         except Exception as e:
-            print(f"Warning: Could not get laughter count for segment {segment_id}: {str(e)}")
+            emit = log.append if log is not None else print
+            emit(f"Warning: Could not get laughter count for segment {segment_id}: {str(e)}")
             return 0
+        self._laughter_cache[segment_id] = result.count
+        return result.count
 
-    def find_overlapping_segments(self, user_id: str) -> List[Tuple[Dict, List[Dict]]]:
-        """Find overlapping segments for a user."""
+    def find_overlapping_segments(
+        self, user_id: str, user_segments: Optional[List[Dict]] = None, log: Optional[List[str]] = None
+    ) -> List[Tuple[Dict, List[Dict]]]:
+        """
+        Find overlapping segments for a user.
+
+        Args:
+            user_id: User whose segments are checked
+            user_segments: Already-fetched segments for this user (fetched here if None)
+            log: Collects output lines instead of printing them (see _cleanup_user)
+        """
+        emit = log.append if log is not None else print
         try:
-            # Get all segments for the user
-            result = self.supabase.table("audio_segments").select("*").eq("user_id", user_id).order("start_time").execute()
+            if user_segments is None:
+                # Get all segments for the user
+                result = self.supabase.table("audio_segments").select(SEGMENT_COLUMNS).eq("user_id", user_id).order("start_time").execute()
+                user_segments = result.data
             
-            if not result.data:
+            if not user_segments:
                 return []
             
-            segments = result.data
-            overlaps = []
-            
-            # Group segments by overlapping time ranges
-            for i, segment1 in enumerate(segments):
+            # Parse each timestamp once and keep epoch seconds on the segment
+            segments = []
+            for segment in user_segments:
                 try:
-                    start1 = datetime.fromisoformat(segment1['start_time'].replace('Z', '+00:00'))
-                    end1 = datetime.fromisoformat(segment1['end_time'].replace('Z', '+00:00'))
-                    
-                    overlapping_group = [segment1]
-                    
-                    # Find all segments that overlap with this one
-                    for j, segment2 in enumerate(segments[i+1:], i+1):
-                        try:
-                            start2 = datetime.fromisoformat(segment2['start_time'].replace('Z', '+00:00'))
-                            end2 = datetime.fromisoformat(segment2['end_time'].replace('Z', '+00:00'))
-                            
-                            # Check if time ranges overlap
-                            if start1 < end2 and start2 < end1:
-                                overlapping_group.append(segment2)
-                                
-                        except Exception as e:
-                            print(f"Warning: Error parsing segment {segment2['id']}: {str(e)}")
-                            continue
-                    
-                    # If we found overlaps, add to the list
-                    if len(overlapping_group) > 1:
-                        overlaps.append((segment1, overlapping_group[1:]))
-                        
+                    segment['_start_ts'] = parse_epoch_seconds(segment['start_time'])
+                    segment['_end_ts'] = parse_epoch_seconds(segment['end_time'])
                 except Exception as e:
-                    print(f"Warning: Error parsing segment {segment1['id']}: {str(e)}")
+                    emit(f"Warning: Error parsing segment {segment['id']}: {str(e)}")
+                    continue
+                # Use creation time if available, otherwise start time (0 if unparseable)
+                try:
+                    segment['_created_ts'] = parse_epoch_seconds(segment.get('created_at') or segment['start_time'])
+                except ValueError:
+                    segment['_created_ts'] = 0
+                segments.append(segment)
+            segments.sort(key=lambda segment: segment['_start_ts'])
+            
+            # Sweep over start-sorted segments: a segment that starts before the
+            # current cluster's furthest end overlaps it, otherwise the cluster is done.
+            # Reason: O(n log n) instead of comparing every pair of segments
+            # Clusters can chain non-overlapping segments; resolve_overlap_group() handles that
+            overlaps = []
+            cluster: List[Dict] = []
+            cluster_end = None
+            for segment in segments:
+                if cluster and segment['_start_ts'] < cluster_end:
+                    cluster.append(segment)
+                    cluster_end = max(cluster_end, segment['_end_ts'])
                     continue
+                if len(cluster) > 1:
+                    overlaps.append((cluster[0], cluster[1:]))
+                cluster = [segment]
+                cluster_end = segment['_end_ts']
+            if len(cluster) > 1:
+                overlaps.append((cluster[0], cluster[1:]))
             
             return overlaps
             
         except Exception as e:
-            print(f"❌ Error finding overlapping segments: {str(e)}")
+            emit(f"❌ Error finding overlapping segments: {str(e)}")
             return []
 
-    def select_segments_to_keep(self, overlapping_group: List[Dict]) -> List[Dict]:
-        """Select which segments to keep from an overlapping group, prioritizing segments with laughter detections."""
+    def select_segments_to_keep(
+        self, overlapping_group: List[Dict], counts: Optional[Dict[str, int]] = None
+    ) -> List[Dict]:
+        """
+        Select which segments to keep from an overlapping group, prioritizing segments with laughter detections.
+
+        Args:
+            overlapping_group: Segments that overlap each other
+            counts: Laughter count per segment id (looked up here if None)
+        """
         if len(overlapping_group) <= 1:
             return overlapping_group
         
-        # Get laughter detection counts for each segment
-        for segment in overlapping_group:
-            segment['laughter_count'] = self.get_segment_laughter_count(segment['id'])
+        # Local lookup instead of writing laughter_count onto the shared segment dicts
+        if counts is None:
+            counts = {
+                segment['id']: self.get_segment_laughter_count(segment['id'])
+                for segment in overlapping_group
+            }
         
         # Sort by priority:
         # 1. Segments with laughter detections (keep segments with laughter over those without)
@@ -110,26 +226,27 @@ class ImprovedDuplicateSegmentCleaner:
         # 3. Most recent creation time
         # 4. Longest duration (more complete data)
         
-        def segment_priority(segment):
-            laughter_score = segment.get('laughter_count', 0) * 1000  # High priority for segments with laughter
+        def base_priority(segment):
+            # Timestamps were parsed once in find_overlapping_segments()
             processed_score = 1 if segment['processed'] else 0
-            
-            # Use a timestamp if available, otherwise use start_time
-            try:
-                created_at = datetime.fromisoformat(segment.get('created_at', segment['start_time']).replace('Z', '+00:00'))
-                time_score = created_at.timestamp()
-            except:
-                time_score = 0
-            
-            # Calculate duration
-            try:
-                start = datetime.fromisoformat(segment['start_time'].replace('Z', '+00:00'))
-                end = datetime.fromisoformat(segment['end_time'].replace('Z', '+00:00'))
-                duration = (end - start).total_seconds()
-            except:
-                duration = 0
-            
-            return (laughter_score, processed_score, time_score, duration)
+            duration = segment['_end_ts'] - segment['_start_ts']
+            return (processed_score, segment['_created_ts'], duration)
+        
+        # Most overlap groups are background audio with no laughs at all;
+        # skip the laughter tier for them
+        if not any(counts[segment['id']] for segment in overlapping_group):
+            sorted_group = sorted(overlapping_group, key=base_priority, reverse=True)
+            return [sorted_group[0]]
+        
+        # Common case: one segment holds all the laughs (re-recordings of the same
+        # event), so it wins on the first tier and no sort is needed
+        with_laughter = [segment for segment in overlapping_group if counts[segment['id']] > 0]
+        if len(with_laughter) == 1:
+            return with_laughter
+        
+        def segment_priority(segment):
+            laughter_score = counts[segment['id']] * 1000  # High priority for segments with laughter
+            return (laughter_score,) + base_priority(segment)
         
         # Sort by priority (highest first)
         sorted_group = sorted(overlapping_group, key=segment_priority, reverse=True)
@@ -137,80 +254,170 @@ class ImprovedDuplicateSegmentCleaner:
         # Keep the best one
         return [sorted_group[0]]
 
-    def cleanup_duplicates(self, user_id: str) -> Dict:
-        """Clean up duplicate segments for a user."""
-        print(f"🔍 Analyzing segments for user: {user_id}")
+    def resolve_overlap_group(
+        self, overlapping_group: List[Dict], counts: Dict[str, int]
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Split a sweep cluster into segments to keep and segments to remove.
+
+        The sweep chains segments transitively (A overlaps B, B overlaps C), so
+        A and C may not overlap at all. Only segments that overlap a kept segment
+        are removed; the rest are resolved again among themselves.
+
+        Args:
+            overlapping_group: One cluster from find_overlapping_segments()
+            counts: Laughter count per segment id
+
+        Returns:
+            (segments_to_keep, segments_to_remove), best kept segment first
+        """
+        segments_to_keep: List[Dict] = []
+        segments_to_remove: List[Dict] = []
+        remaining = overlapping_group
+        while remaining:
+            kept = self.select_segments_to_keep(remaining, counts)[0]
+            segments_to_keep.append(kept)
+            leftover = []
+            for segment in remaining:
+                if segment is kept:
+                    continue
+                # Same overlap test as the original pairwise scan
+                if segment['_start_ts'] < kept['_end_ts'] and kept['_start_ts'] < segment['_end_ts']:
+                    segments_to_remove.append(segment)
+                else:
+                    leftover.append(segment)
+            remaining = leftover
+        return segments_to_keep, segments_to_remove
+
+    def cleanup_duplicates(
+        self, user_id: str, user_segments: Optional[List[Dict]] = None, log: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Clean up duplicate segments for a user.
+
+        Args:
+            user_id: User whose segments are cleaned up
+            user_segments: Already-fetched segments for this user. When None, the
+                segments and laughter counts are fetched for this user only.
+            log: Collects output lines instead of printing them (see _cleanup_user)
+        """
+        emit = log.append if log is not None else print
+        emit(f"🔍 Analyzing segments for user: {user_id}")
+        
+        if user_segments is None:
+            # One bulk fetch of laughter counts instead of a query per segment
+            self._fetch_laughter_counts(user_id)
         
         # Find overlapping segments
-        overlaps = self.find_overlapping_segments(user_id)
+        overlaps = self.find_overlapping_segments(user_id, user_segments, log)
         
         if not overlaps:
-            print("✅ No overlapping segments found")
+            emit("✅ No overlapping segments found")
             return {"removed": 0, "kept": 0, "groups": 0}
         
-        print(f"Found {len(overlaps)} overlapping groups")
+        emit(f"Found {len(overlaps)} overlapping groups")
         
         removed_count = 0
         kept_count = 0
+        ids_to_remove: List[str] = []
         
         for i, (original, duplicates) in enumerate(overlaps):
-            print(f"\n📊 Group {i+1}: {len(duplicates) + 1} overlapping segments")
+            emit(f"\n📊 Group {i+1}: {len(duplicates) + 1} overlapping segments")
             
             # Show the segments with laughter counts
             all_segments = [original] + duplicates
+            group_counts = {
+                segment['id']: self.get_segment_laughter_count(segment['id'], log)
+                for segment in all_segments
+            }
             for j, segment in enumerate(all_segments):
-                laughter_count = self.get_segment_laughter_count(segment['id'])
+                laughter_count = group_counts[segment['id']]
                 status = "✅" if segment['processed'] else "⏳"
                 start_time = segment['start_time'][:19]
                 end_time = segment['end_time'][:19]
                 laughter_info = f" ({laughter_count} laughs)" if laughter_count > 0 else ""
-                print(f"  {j+1}. {status} {segment['id'][:8]}... | {start_time} → {end_time}{laughter_info}")
+                emit(f"  {j+1}. {status} {segment['id'][:8]}... | {start_time} → {end_time}{laughter_info}")
             
             # Select which segments to keep
-            segments_to_keep = self.select_segments_to_keep(all_segments)
-            segments_to_remove = [s for s in all_segments if s not in segments_to_keep]
+            segments_to_keep, segments_to_remove = self.resolve_overlap_group(all_segments, group_counts)
             
             kept_segment = segments_to_keep[0]
-            kept_laughter_count = self.get_segment_laughter_count(kept_segment['id'])
-            print(f"  🎯 Keeping: {kept_segment['id'][:8]}... ({kept_laughter_count} laughs)")
-            print(f"  🗑️  Removing: {len(segments_to_remove)} duplicates")
+            kept_laughter_count = group_counts[kept_segment['id']]
+            emit(f"  🎯 Keeping: {kept_segment['id'][:8]}... ({kept_laughter_count} laughs)")
+            emit(f"  🗑️  Removing: {len(segments_to_remove)} duplicates")
             
-            # Remove duplicate segments
-            for segment in segments_to_remove:
-                try:
-                    self.supabase.table("audio_segments").delete().eq("id", segment['id']).execute()
-                    removed_count += 1
-                    print(f"    ✅ Removed: {segment['id'][:8]}...")
-                except Exception as e:
-                    print(f"    ❌ Failed to remove {segment['id'][:8]}...: {str(e)}")
+            # Queue duplicate segments for one batched delete after all groups
+            ids_to_remove.extend(segment['id'] for segment in segments_to_remove)
             
             kept_count += len(segments_to_keep)
         
+        # Remove duplicate segments in batches instead of one DELETE per id
+        for offset in range(0, len(ids_to_remove), DELETE_BATCH_SIZE):
+            batch = ids_to_remove[offset:offset + DELETE_BATCH_SIZE]
+            try:
+                self.supabase.table("audio_segments").delete().in_("id", batch).execute()
+                removed_count += len(batch)
+                emit(f"    ✅ Removed {len(batch)} duplicate segments")
+            except Exception as e:
+                emit(f"    ❌ Failed to remove batch of {len(batch)} segments: {str(e)}")
+        
         return {
             "removed": removed_count,
             "kept": kept_count,
             "groups": len(overlaps)
         }
 
+    def _cleanup_user(self, user_id: str, user_segments: List[Dict]) -> Dict:
+        """
+        Run cleanup_duplicates for one user from a worker thread.
+
+        Output is collected rather than printed so each user's kept/removed
+        segments stay together in the log (it is the audit trail of deletions).
+
+        Returns:
+            cleanup_duplicates() result plus the user's output lines under "log"
+        """
+        log = [f"\n👤 Processing user: {user_id}"]
+        result = self.cleanup_duplicates(user_id, user_segments, log)
+        result["log"] = log
+        return result
+
     def run_cleanup(self) -> bool:
         """Run the complete cleanup process."""
         try:
-            # Get all users
-            users_result = self.supabase.table("users").select("id").execute()
+            # Fetch every user's segments and laughter counts once, instead of
+            # one round of queries per user
+            all_segments = self._fetch_paginated(
+                lambda: self.supabase.table("audio_segments")
+                .select(f"user_id,{SEGMENT_COLUMNS}")
+                .order("user_id")
+                .order("start_time")
+                .order("id")
+            )
             
-            if not users_result.data:
-                print("❌ No users found")
-                return False
+            if not all_segments:
+                print("✅ No audio segments found - nothing to clean up")
+                return True
+            
+            self._fetch_laughter_counts()
             
             total_removed = 0
             total_kept = 0
             total_groups = 0
             
-            for user in users_result.data:
-                user_id = user['id']
-                print(f"\n👤 Processing user: {user_id}")
-                
-                result = self.cleanup_duplicates(user_id)
+            segments_by_user = [
+                (user_id, list(user_segments))
+                for user_id, user_segments in groupby(all_segments, key=lambda segment: segment['user_id'])
+            ]
+            
+            # Per-user work is independent and I/O-bound (Supabase deletes), so threads overlap it;
+            # each user's output is printed afterwards, in user order
+            with ThreadPoolExecutor(max_workers=MAX_CLEANUP_WORKERS) as executor:
+                results = list(executor.map(lambda args: self._cleanup_user(*args), segments_by_user))
+            
+            for result in results:
+                for line in result['log']:
+                    print(line)
                 total_removed += result['removed']
                 total_kept += result['kept']
                 total_groups += result['groups']
@@ -17,14 +17,27 @@ Options:
 import os
 import sys
 import argparse
+import hashlib
 import logging
-from datetime import datetime, timedelta
+import mmap
+from datetime import timedelta
 from typing import List, Dict, Tuple
 from dotenv import load_dotenv
 from supabase import create_client, Client
 import shutil
 from pathlib import Path
 
+# Add project root to path so the shared src.utils helpers can be imported
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.timestamp_utils import parse_epoch_seconds
+
+try:
+    import xxhash  # Optional: faster content hashing when installed
+except ImportError:
+    xxhash = None
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -32,6 +45,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Max ids per .in_() delete (keeps the PostgREST request URL under size limits)
+DELETE_BATCH_SIZE = 500
+
+
+# Files above this size are hashed through mmap instead of a single read()
+MMAP_THRESHOLD_BYTES = 1024 * 1024
+
+
+def _file_digest(path: str) -> str:
+    """Return a content hash of a file (xxh3 if available, else blake2b)."""
+    hasher = xxhash.xxh3_64() if xxhash else hashlib.blake2b()
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                hasher.update(mapped)
+        else:
+            hasher.update(f.read())
+    return hasher.hexdigest()
+
 class DuplicateCleanup:
     def __init__(self, dry_run: bool = False, aggressive: bool = False):
         self.dry_run = dry_run
@@ -55,10 +87,9 @@ class DuplicateCleanup:
         """Find duplicate laughter detections."""
         logger.info("🔍 Scanning for duplicate laughter detections...")
         
-        # Get all laughter detections grouped by user and time window
-        result = self.supabase.table("laughter_detections").select("*").order("user_id").order("timestamp").execute()
+        detections = self._fetch_duplicate_candidates()
         
-        if not result.data:
+        if not detections:
             logger.info("✅ No laughter detections found")
             return []
         
@@ -67,12 +98,14 @@ class DuplicateCleanup:
         current_window = None
         window_detections = []
         
-        for detection in result.data:
+        for detection in detections:
             user_id = detection["user_id"]
-            timestamp = datetime.fromisoformat(detection["timestamp"].replace('Z', '+00:00'))
+            # Parse once; _process_window_duplicates reuses the cached epoch seconds
+            timestamp = parse_epoch_seconds(detection["timestamp"])
+            detection["_ts"] = timestamp
             
             # New user or time window
-            if current_user != user_id or not current_window or (timestamp - current_window).total_seconds() > 5:
+            if current_user != user_id or current_window is None or timestamp - current_window > 5:
                 # Process previous window if it had duplicates
                 if len(window_detections) > 1:
                     duplicates.extend(self._process_window_duplicates(window_detections))
@@ -91,6 +124,23 @@ class DuplicateCleanup:
         logger.info(f"🔍 Found {len(duplicates)} duplicate laughter detections")
         return duplicates
     
+    def _fetch_duplicate_candidates(self) -> List[Dict]:
+        """
+        Fetch laughter detections that could be duplicates, ordered by user and time.
+        
+        Prefers the find_laughter_dupes() RPC (scripts/setup/find_laughter_dupes.sql),
+        which returns only detections with a same-user neighbor within 5 seconds.
+        Falls back to fetching every detection if the function is not installed.
+        """
+        try:
+            result = self.supabase.rpc("find_laughter_dupes").execute()
+            return result.data or []
+        except Exception as e:
+            logger.warning(f"⚠️  find_laughter_dupes RPC unavailable, scanning all detections: {str(e)}")
+        
+        result = self.supabase.table("laughter_detections").select("id,user_id,timestamp,probability,clip_path,created_at").order("user_id").order("timestamp").execute()
+        return result.data or []
+    
     def _process_window_duplicates(self, detections: List[Dict]) -> List[Dict]:
         """Process a window of detections to find duplicates."""
         if len(detections) <= 1:
@@ -105,8 +155,7 @@ class DuplicateCleanup:
         
         for detection in detections[1:]:
             # Check if it's really a duplicate
-            time_diff = abs((datetime.fromisoformat(detection["timestamp"].replace('Z', '+00:00')) - 
-                           datetime.fromisoformat(keep["timestamp"].replace('Z', '+00:00'))).total_seconds())
+            time_diff = abs(detection["_ts"] - keep["_ts"])
             prob_diff = abs(detection["probability"] - keep["probability"])
             
             # Consider it a duplicate if within 5 seconds and probability within 20%
@@ -130,57 +179,63 @@ class DuplicateCleanup:
             logger.info("✅ No uploads directory found")
             return []
         
+        # os.scandir entries cache type info, so each clip costs one stat() call
         clip_files = []
-        for user_dir in self.uploads_dir.iterdir():
-            if user_dir.is_dir():
-                laughter_dir = user_dir / "laughter_clips"
-                if laughter_dir.exists():
-                    for clip_file in laughter_dir.glob("*.wav"):
+        with os.scandir(self.uploads_dir) as user_dirs:
+            for user_dir in user_dirs:
+                if not user_dir.is_dir():
+                    continue
+                laughter_dir = os.path.join(user_dir.path, "laughter_clips")
+                if not os.path.isdir(laughter_dir):
+                    continue
+                with os.scandir(laughter_dir) as entries:
+                    for entry in entries:
+                        if not entry.name.endswith(".wav") or not entry.is_file():
+                            continue
+                        st = entry.stat()
                         clip_files.append({
-                            "path": str(clip_file),
-                            "size": clip_file.stat().st_size,
-                            "mtime": clip_file.stat().st_mtime,
+                            "path": entry.path,
+                            "size": st.st_size,
+                            "mtime": st.st_mtime,
                             "user_id": user_dir.name
                         })
         
-        # Group by size and find duplicates
+        # Group by size first; only same-size files can be identical
         size_groups = {}
         for clip in clip_files:
-            size = clip["size"]
-            if size not in size_groups:
-                size_groups[size] = []
-            size_groups[size].append(clip)
+            size_groups.setdefault(clip["size"], []).append(clip)
         
         duplicates = []
         for size, clips in size_groups.items():
-            if len(clips) > 1:
+            if len(clips) <= 1:
+                continue
+            
+            # Hash each candidate once and group by full content digest
+            digest_groups = {}
+            for clip in clips:
+                try:
+                    digest = _file_digest(clip["path"])
+                except OSError as e:
+                    logger.warning(f"⚠️  Could not hash clip file {clip['path']}: {str(e)}")
+                    continue
+                digest_groups.setdefault(digest, []).append(clip)
+            
+            for identical in digest_groups.values():
+                if len(identical) <= 1:
+                    continue
                 # Sort by modification time (keep newest)
-                clips.sort(key=lambda x: x["mtime"], reverse=True)
-                keep = clips[0]
-                
-                for clip in clips[1:]:
-                    # Check if files are identical (basic check)
-                    if self._files_identical(keep["path"], clip["path"]):
-                        duplicates.append({
-                            "path": clip["path"],
-                            "user_id": clip["user_id"],
-                            "reason": f"Duplicate of {keep['path']} (same size: {size} bytes)"
-                        })
+                identical.sort(key=lambda x: x["mtime"], reverse=True)
+                keep = identical[0]
+                for clip in identical[1:]:
+                    duplicates.append({
+                        "path": clip["path"],
+                        "user_id": clip["user_id"],
+                        "reason": f"Duplicate of {keep['path']} (same content, {size} bytes)"
+                    })
         
         logger.info(f"🔍 Found {len(duplicates)} duplicate clip files")
         return duplicates
     
-    def _files_identical(self, path1: str, path2: str) -> bool:
-        """Check if two files are identical (basic implementation)."""
-        try:
-            with open(path1, 'rb') as f1, open(path2, 'rb') as f2:
-                # Read first 1KB to compare
-                chunk1 = f1.read(1024)
-                chunk2 = f2.read(1024)
-                return chunk1 == chunk2
-        except Exception:
-            return False
-    
     def cleanup_duplicate_laughter_detections(self, duplicates: List[Dict]) -> int:
         """Remove duplicate laughter detections from database."""
         if not duplicates:
@@ -189,17 +244,22 @@ class DuplicateCleanup:
         
         logger.info(f"🧹 Cleaning up {len(duplicates)} duplicate laughter detections...")
         
+        if self.dry_run:
+            for duplicate in duplicates:
+                logger.info(f"🔍 [DRY RUN] Would delete laughter detection: {duplicate['id']} - {duplicate['reason']}")
+            return len(duplicates)
+        
+        # Delete in batches instead of one DELETE per id
         deleted_count = 0
-        for duplicate in duplicates:
+        for offset in range(0, len(duplicates), DELETE_BATCH_SIZE):
+            batch = duplicates[offset:offset + DELETE_BATCH_SIZE]
             try:
-                if self.dry_run:
-                    logger.info(f"🔍 [DRY RUN] Would delete laughter detection: {duplicate['id']} - {duplicate['reason']}")
-                else:
-                    self.supabase.table("laughter_detections").delete().eq("id", duplicate["id"]).execute()
+                self.supabase.table("laughter_detections").delete().in_("id", [d["id"] for d in batch]).execute()
+                for duplicate in batch:
                     logger.info(f"🗑️  Deleted laughter detection: {duplicate['id']} - {duplicate['reason']}")
-                deleted_count += 1
+                deleted_count += len(batch)
             except Exception as e:
-                logger.error(f"❌ Error deleting laughter detection {duplicate['id']}: {str(e)}")
+                logger.error(f"❌ Error deleting batch of {len(batch)} laughter detections: {str(e)}")
         
         return deleted_count
     
@@ -5,10 +5,22 @@ Clean up orphaned audio files that have been processed but not deleted.
 
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Configuration
 uploads_dir = Path('./uploads/audio')
+MAX_DELETE_WORKERS = 16
+
+
+def delete_file(ogg: tuple) -> tuple:
+    """Delete one (path, name, size) entry; returns it with the error or None."""
+    try:
+        os.unlink(ogg[0])
+        return ogg, None
+    except Exception as e:
+        return ogg, e
+
 
 print("🗑️  Cleaning up orphaned audio files...")
 print()
@@ -24,24 +36,30 @@ print(f"Found {len(user_dirs)} user directories")
 total_deleted = 0
 total_size = 0
 
+# Collect every user's .ogg files first (scandir gives the size without a separate stat per path)
+ogg_files = []
 for user_dir in user_dirs:
     user_id = user_dir.name
     print(f"\n📁 User: {user_id}")
     
-    # Find all .ogg files
-    ogg_files = list(user_dir.glob('*.ogg'))
-    print(f"  Found {len(ogg_files)} .ogg files")
-    
-    # Delete all .ogg files (they've been processed)
-    for ogg_file in ogg_files:
-        try:
-            file_size = ogg_file.stat().st_size
-            ogg_file.unlink()
+    user_oggs = []
+    with os.scandir(user_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.ogg') and entry.is_file():
+                user_oggs.append((entry.path, entry.name, entry.stat().st_size))
+    print(f"  Found {len(user_oggs)} .ogg files")
+    ogg_files.extend(user_oggs)
+
+# Delete all .ogg files (they've been processed); unlink is I/O-bound, so run it in parallel
+print()
+with ThreadPoolExecutor(max_workers=MAX_DELETE_WORKERS) as executor:
+    for (ogg_path, ogg_name, file_size), error in executor.map(delete_file, ogg_files):
+        if error is None:
             total_deleted += 1
             total_size += file_size
-            print(f"  ✅ Deleted: {ogg_file.name} ({file_size / 1024 / 1024:.2f} MB)")
-        except Exception as e:
-            print(f"  ❌ Failed to delete {ogg_file.name}: {str(e)}")
+            print(f"  ✅ Deleted: {ogg_name} ({file_size / 1024 / 1024:.2f} MB)")
+        else:
+            print(f"  ❌ Failed to delete {ogg_name}: {str(error)}")
 
 print()
 print("=" * 50)
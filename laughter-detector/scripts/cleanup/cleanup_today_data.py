@@ -6,6 +6,7 @@ Usage: python cleanup_today_data.py [YYYY-MM-DD]
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from supabase import create_client
@@ -51,15 +52,16 @@ if clips_dir.exists():
         print(f"  Deleted {clip.name}")
 
 # Delete any OGG files for the date
+# One glob across all user directories (filenames start with the date), then
+# unlink in a thread pool since deletes are I/O-bound
 audio_dir = Path("uploads/audio")
 if audio_dir.exists():
-    for user_dir in audio_dir.iterdir():
-        if user_dir.is_dir():
-            today_ogg = list(user_dir.glob(f"{date_prefix}_*.ogg"))
-            print(f"Deleting {len(today_ogg)} OGG files for {date_start}...")
-            for ogg in today_ogg:
-                ogg.unlink()
-                print(f"  Deleted {ogg.name}")
+    today_ogg = list(audio_dir.glob(f"*/{date_prefix}_*.ogg"))
+    print(f"Deleting {len(today_ogg)} OGG files for {date_start}...")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(Path.unlink, today_ogg))
+    for ogg in today_ogg:
+        print(f"  Deleted {ogg.name}")
 
 print("\n✅ Cleanup complete - ready for fresh test run")
 
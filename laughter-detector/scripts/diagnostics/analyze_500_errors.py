@@ -19,9 +19,16 @@ import json
 import argparse
 from pathlib import Path
 from collections import defaultdict
+from functools import lru_cache
 from datetime import datetime, timedelta
 import pytz
 
+try:
+    import orjson  # Optional: much faster decoding of large api_calls blobs
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 # Bootstrap
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
@@ -29,9 +36,114 @@ sys.path.insert(0, str(PROJECT_ROOT))
 import src  # noqa: F401
 from src.services.supabase_client import get_service_role_client
 
+# One module-level client: its PostgREST session is a pooled httpx client, so
+# every query below reuses the same kept-alive connection
 supabase = get_service_role_client()
 
 
+@lru_cache(maxsize=128)
+def _tz(name: str):
+    """Return the pytz timezone for name (cached), falling back to UTC if invalid."""
+    try:
+        return pytz.timezone(name)
+    except Exception:
+        return pytz.UTC
+
+
+@lru_cache(maxsize=64)
+def _utc_bounds(tz_name: str, date_str: str):
+    """
+    Return the (start, end) UTC datetimes of a calendar date in a timezone.
+    
+    Args:
+        tz_name: Timezone name (invalid names fall back to UTC)
+        date_str: Date in YYYY-MM-DD format
+    """
+    tz = _tz(tz_name)
+    naive = datetime.strptime(date_str, "%Y-%m-%d")
+    # Localize both midnights so a DST change during the day is handled
+    start_of_day = tz.localize(naive)
+    end_of_day = tz.localize(naive + timedelta(days=1))
+    return start_of_day.astimezone(pytz.UTC), end_of_day.astimezone(pytz.UTC)
+
+
+def _fetch_all(build_query) -> list:
+    """
+    Fetch every row of a query, a page at a time.
+    
+    Args:
+        build_query: Zero-argument callable returning a fresh, ordered query
+    
+    Returns:
+        All rows
+    """
+    rows = []
+    # Fetch with pagination (Supabase limits to 1000 by default)
+    # REUSES PATTERN: Same pagination logic as src/api/data_routes.py get_daily_summary()
+    offset = 0
+    page_size = 1000
+    while True:
+        result = build_query().range(offset, offset + page_size - 1).execute()
+        if not result.data:
+            break
+        rows.extend(result.data)
+        if len(result.data) < page_size:
+            break
+        offset += page_size
+    return rows
+
+
+def _fetch_detection_counts(date: str, user_windows: dict) -> dict:
+    """
+    Count each user's laughter detections inside their own UTC day window.
+
+    Prefers the count_laughter_detections_for_day() RPC
+    (scripts/setup/count_laughter_detections_for_day.sql), which returns one
+    count per user. If the function is not installed, one query covers the
+    envelope of all windows (users are in different timezones) and rows are
+    filtered per user client-side.
+
+    Args:
+        date: Date in YYYY-MM-DD format
+        user_windows: user_id -> (start_utc, end_utc)
+
+    Returns:
+        user_id -> detection count
+    """
+    counts = defaultdict(int)
+    if not user_windows:
+        return counts
+
+    try:
+        result = supabase.rpc("count_laughter_detections_for_day", {"target_date": date}).execute()
+        for row in result.data or []:
+            counts[row["user_id"]] = row["detection_count"]
+        return counts
+    except Exception as e:
+        print(f"⚠️  count_laughter_detections_for_day RPC unavailable, counting rows: {str(e)}")
+
+    envelope_start = min(start for start, _ in user_windows.values())
+    envelope_end = max(end for _, end in user_windows.values())
+
+    rows = _fetch_all(
+        lambda: supabase.table("laughter_detections")
+        .select("user_id, timestamp")
+        .gte("timestamp", envelope_start.isoformat())
+        .lt("timestamp", envelope_end.isoformat())
+        .order("id")
+    )
+    for row in rows:
+        window = user_windows.get(row["user_id"])
+        if window is None:
+            continue
+        start_utc, end_utc = window
+        timestamp = datetime.fromisoformat(row["timestamp"].replace("Z", "+00:00"))
+        if start_utc <= timestamp < end_utc:
+            counts[row["user_id"]] += 1
+
+    return counts
+
+
 def analyze_500_errors_for_day(date: str):
     """
     Analyze 500 errors from processing_logs for a given day.
@@ -44,48 +156,69 @@ def analyze_500_errors_for_day(date: str):
     print("=" * 80)
     
     # Get all users
-    users = supabase.table("users").select("id, email, timezone").execute()
+    users = _fetch_all(
+        lambda: supabase.table("users").select("id, email, timezone").order("id")
+    )
     
-    if not users.data:
+    if not users:
         print("❌ No users found")
         return
     
-    for user in users.data:
+    # Every processing log for this date (one log per user per day). Filtering
+    # by date alone covers all users without an ever-growing user_id IN list
+    logs = _fetch_all(
+        lambda: supabase.table("processing_logs")
+        .select("user_id, status, audio_files_downloaded, laughter_events_found, duplicates_skipped, api_calls")
+        .eq("date", date)
+        .order("id")
+    )
+    logs_by_user = {}
+    for log in logs:
+        logs_by_user.setdefault(log["user_id"], log)
+    
+    # Most users have no log on a given day - report them once as a count and
+    # only analyze (and count detections for) users that were processed
+    active_users = [user for user in users if user["id"] in logs_by_user]
+    inactive_count = len(users) - len(active_users)
+    if inactive_count:
+        print(f"\n   ⚠️  {inactive_count} user(s) with no processing log for {date}")
+    
+    # Each user's day in their own timezone, as a UTC range
+    # (memoized per timezone - most users share a handful of them)
+    user_windows = {
+        user["id"]: _utc_bounds(user.get("timezone") or "UTC", date)
+        for user in active_users
+    }
+    
+    # One paginated query for all users' detections instead of one per user
+    detection_counts = _fetch_detection_counts(date, user_windows)
+    
+    for user in active_users:
         user_id = user["id"]
         user_email = user["email"]
-        user_timezone = user.get("timezone") or "UTC"
-        
-        print(f"\n{'=' * 80}")
-        print(f"👤 {user_email} ({user_id})")
-        print(f"{'=' * 80}")
         
-        # Get processing log for this date
-        logs = (
-            supabase.table("processing_logs")
-            .select("*")
-            .eq("user_id", user_id)
-            .eq("date", date)
-            .execute()
-        )
+        # Buffer this user's report and write it once, rather than one
+        # write per line (thousands of writes on high-volume days)
+        out_lines = []
         
-        if not logs.data:
-            print(f"   ⚠️  No processing log found for {date}")
-            continue
+        out_lines.append(f"\n{'=' * 80}")
+        out_lines.append(f"👤 {user_email} ({user_id})")
+        out_lines.append(f"{'=' * 80}")
         
-        log = logs.data[0]  # Should be one log per user per day
+        log = logs_by_user[user_id]
         
-        print(f"\n   📋 Processing Log Summary:")
-        print(f"      Status: {log.get('status', 'N/A')}")
-        print(f"      Audio files downloaded: {log.get('audio_files_downloaded', 0)}")
-        print(f"      Laughter events found: {log.get('laughter_events_found', 0)}")
-        print(f"      Duplicates skipped: {log.get('duplicates_skipped', 0)}")
+        out_lines.append(f"\n   📋 Processing Log Summary:")
+        out_lines.append(f"      Status: {log.get('status', 'N/A')}")
+        out_lines.append(f"      Audio files downloaded: {log.get('audio_files_downloaded', 0)}")
+        out_lines.append(f"      Laughter events found: {log.get('laughter_events_found', 0)}")
+        out_lines.append(f"      Duplicates skipped: {log.get('duplicates_skipped', 0)}")
         
         # Analyze API calls
         api_calls = log.get('api_calls')
         if api_calls:
             if isinstance(api_calls, str):
                 try:
-                    api_calls = json.loads(api_calls)
+                    api_calls = json_loads(api_calls)
                 except:
                     api_calls = []
             
@@ -104,45 +237,30 @@ def analyze_500_errors_for_day(date: str):
                             'duration_ms': call.get('duration_ms', 0)
                         })
                 
-                print(f"\n   🌐 API Calls Breakdown:")
-                print(f"      Total API calls: {len(api_calls)}")
-                for status, count in sorted(status_counts.items()):
-                    print(f"      Status {status}: {count}")
+                # Counting is done; freeze to a plain dict so reads can't add keys
+                status_counts = dict(status_counts)
+                error_500_count = status_counts.get(500, 0)
+                
+                out_lines.append(f"\n   🌐 API Calls Breakdown:")
+                out_lines.append(f"      Total API calls: {len(api_calls)}")
+                # Status may be an int or "unknown"; sort ints first so mixed keys can't raise TypeError
+                for status, count in sorted(status_counts.items(), key=lambda kv: (isinstance(kv[0], str), kv[0])):
+                    out_lines.append(f"      Status {status}: {count}")
                 
-                if status_counts[500] > 0:
-                    print(f"\n   ⚠️  500 ERRORS FOUND: {status_counts[500]}")
-                    print(f"      These chunks were skipped (no retry in original code)")
-                    print(f"      First 5 500 errors:")
+                if error_500_count > 0:
+                    out_lines.append(f"\n   ⚠️  500 ERRORS FOUND: {error_500_count}")
+                    out_lines.append(f"      These chunks were skipped (no retry in original code)")
+                    out_lines.append(f"      First 5 500 errors:")
                     for i, error in enumerate(error_500_details[:5], 1):
-                        print(f"         {i}. {error['timestamp']}: {error['error']}")
+                        out_lines.append(f"         {i}. {error['timestamp']}: {error['error']}")
                     if len(error_500_details) > 5:
-                        print(f"         ... and {len(error_500_details) - 5} more")
+                        out_lines.append(f"         ... and {len(error_500_details) - 5} more")
                 else:
-                    print(f"\n   ✅ No 500 errors for this user on {date}")
-        
-        # Get actual laughter detections for this day
-        try:
-            user_tz = pytz.timezone(user_timezone)
-        except:
-            user_tz = pytz.UTC
-        
-        # Convert date to UTC range
-        start_of_day = user_tz.localize(datetime.strptime(date, "%Y-%m-%d"))
-        end_of_day = start_of_day + timedelta(days=1)
-        start_utc = start_of_day.astimezone(pytz.UTC)
-        end_utc = end_of_day.astimezone(pytz.UTC)
-        
-        detections = (
-            supabase.table("laughter_detections")
-            .select("id")
-            .eq("user_id", user_id)
-            .gte("timestamp", start_utc.isoformat())
-            .lt("timestamp", end_utc.isoformat())
-            .execute()
-        )
+                    out_lines.append(f"\n   ✅ No 500 errors for this user on {date}")
         
-        detection_count = len(detections.data) if detections.data else 0
-        print(f"\n   🎭 Final Laughter Detections (stored in DB): {detection_count}")
+        detection_count = detection_counts[user_id]
+        out_lines.append(f"\n   🎭 Final Laughter Detections (stored in DB): {detection_count}")
+        sys.stdout.write("\n".join(out_lines) + "\n")
 
 
 if __name__ == "__main__":
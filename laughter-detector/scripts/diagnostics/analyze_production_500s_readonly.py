@@ -14,8 +14,17 @@ import sys
 from pathlib import Path
 import json
 import argparse
-from collections import defaultdict
+from collections import Counter
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
+import pytz
+
+try:
+    import orjson  # Optional: much faster decoding of large api_calls blobs
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
@@ -38,6 +47,12 @@ from src.utils.httpx_patch import enable_proxy_keyword_compat
 enable_proxy_keyword_compat()
 
 from supabase import create_client
+from supabase.lib.client_options import ClientOptions
+
+# Every query goes through this one client, whose PostgREST session is a
+# single pooled httpx client - TLS is negotiated once and the connection is
+# kept alive across pages. A generous timeout covers large api_calls pages.
+POSTGREST_TIMEOUT_SECONDS = 30
 
 def get_production_client():
     """Get production Supabase client (read-only operations)."""
@@ -47,7 +62,121 @@ def get_production_client():
     if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
         raise ValueError("Production Supabase credentials not found in .env.production")
     
-    return create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    return create_client(
+        SUPABASE_URL,
+        SUPABASE_SERVICE_ROLE_KEY,
+        options=ClientOptions(postgrest_client_timeout=POSTGREST_TIMEOUT_SECONDS),
+    )
+
+def _analyze_logs(logs, user_map, min_500_errors, test_cases):
+    """Append a test case for each log in this page with enough 500 errors."""
+    for log in logs:
+        api_calls = log.get("api_calls", [])
+        if isinstance(api_calls, str):
+            try:
+                api_calls = json_loads(api_calls)
+            except:
+                api_calls = []
+        
+        # Extract statuses once; Counter tallies them in C, and retry patterns
+        # (a 500 immediately followed by a 200) come from adjacent pairs
+        statuses = [call.get("status_code", "unknown") for call in api_calls]
+        status_counts = Counter(statuses)
+        retry_patterns = sum(
+            1 for prev, status in zip(statuses, statuses[1:]) if prev == 500 and status == 200
+        )
+        
+        # Counter reads of missing keys return 0 without inserting them
+        error_500_count = status_counts[500]
+        
+        if error_500_count >= min_500_errors:
+            test_cases.append(TestCase(
+                date=log["date"],
+                user_id=log["user_id"],
+                user_email=user_map.get(log["user_id"], "Unknown"),
+                errors_500=error_500_count,
+                success_200=status_counts[200],
+                no_data_404=status_counts[404],
+                retry_patterns=retry_patterns,
+                laughter_events=log.get("laughter_events_found", 0),
+                duplicates_skipped=log.get("duplicates_skipped", 0),
+                detections_stored=0,
+            ))
+
+@dataclass
+class TestCase:
+    """One (user, date) with enough 500 errors to be worth testing retries on."""
+    
+    # Explicit __slots__ (dataclass(slots=True) needs Python 3.10+): there can
+    # be one row per user per day over the whole window
+    __slots__ = (
+        "date", "user_id", "user_email", "errors_500", "success_200", "no_data_404",
+        "retry_patterns", "laughter_events", "duplicates_skipped", "detections_stored",
+    )
+    
+    date: str
+    user_id: str
+    user_email: str
+    errors_500: int
+    success_200: int
+    no_data_404: int
+    retry_patterns: int
+    laughter_events: int
+    duplicates_skipped: int
+    detections_stored: int
+
+@lru_cache(maxsize=128)
+def _tz(name):
+    """Return the pytz timezone for name (cached), falling back to UTC if invalid."""
+    try:
+        return pytz.timezone(name)
+    except Exception:
+        return pytz.UTC
+
+def _attach_detection_counts(supabase, test_cases, user_timezones, start_date, end_date):
+    """
+    Set tc.detections_stored for each test case from one batched query.
+    
+    Detections for every test-case user over the whole window are fetched
+    together and bucketed into (user_id, local date) client-side, instead of
+    one query per (user, date).
+    """
+    wanted = {(tc.user_id, tc.date) for tc in test_cases}
+    counts = Counter()
+    if wanted:
+        user_ids = list({user_id for user_id, _ in wanted})
+        # Pad by a day each side so every timezone's local day is covered
+        envelope_start = datetime.combine(start_date - timedelta(days=1), datetime.min.time(), pytz.UTC)
+        envelope_end = datetime.combine(end_date + timedelta(days=2), datetime.min.time(), pytz.UTC)
+        
+        # REUSES PATTERN: Same pagination logic as src/api/data_routes.py get_daily_summary()
+        offset = 0
+        page_size = 1000
+        while True:
+            result = (
+                supabase.table("laughter_detections")
+                .select("user_id, timestamp")
+                .in_("user_id", user_ids)
+                .gte("timestamp", envelope_start.isoformat())
+                .lt("timestamp", envelope_end.isoformat())
+                .order("id")
+                .range(offset, offset + page_size - 1)
+                .execute()
+            )
+            if not result.data:
+                break
+            for row in result.data:
+                user_id = row["user_id"]
+                timestamp = datetime.fromisoformat(row["timestamp"].replace("Z", "+00:00"))
+                local_date = timestamp.astimezone(_tz(user_timezones.get(user_id) or "UTC")).date().isoformat()
+                if (user_id, local_date) in wanted:
+                    counts[(user_id, local_date)] += 1
+            if len(result.data) < page_size:
+                break
+            offset += page_size
+    
+    for tc in test_cases:
+        tc.detections_stored = counts[(tc.user_id, tc.date)]
 
 def analyze_production_500s(days=60, min_500_errors=1):
     """Analyze production logs for 500 errors (read-only)."""
@@ -63,61 +192,42 @@ def analyze_production_500s(days=60, min_500_errors=1):
     start_date = end_date - timedelta(days=days)
     
     # Get users
-    users = supabase.table("users").select("id, email").execute()
+    users = supabase.table("users").select("id, email, timezone").execute()
     user_map = {user["id"]: user["email"] for user in users.data} if users.data else {}
+    user_timezones = {user["id"]: user.get("timezone") for user in users.data or []}
     
-    # Get processing logs
+    # Get processing logs one page at a time so only one page of api_calls
+    # blobs is in memory at once (and >1000 rows aren't silently truncated)
     print(f"\n📊 Fetching processing logs from {start_date} to {end_date}...")
-    logs = (
-        supabase.table("processing_logs")
-        .select("user_id, date, api_calls, laughter_events_found, duplicates_skipped")
-        .gte("date", str(start_date))
-        .lte("date", str(end_date))
-        .execute()
-    )
-    
-    print(f"   Found {len(logs.data) if logs.data else 0} processing log(s)")
-    
-    # Analyze
     test_cases = []
+    total_logs = 0
+    offset = 0
+    page_size = 1000
+    while True:
+        logs = (
+            supabase.table("processing_logs")
+            .select("user_id, date, api_calls, laughter_events_found, duplicates_skipped")
+            .gte("date", str(start_date))
+            .lte("date", str(end_date))
+            .order("id")
+            .range(offset, offset + page_size - 1)
+            .execute()
+        )
+        if not logs.data:
+            break
+        total_logs += len(logs.data)
+        _analyze_logs(logs.data, user_map, min_500_errors, test_cases)
+        if len(logs.data) < page_size:
+            break
+        offset += page_size
     
-    for log in logs.data or []:
-        api_calls = log.get("api_calls", [])
-        if isinstance(api_calls, str):
-            try:
-                api_calls = json.loads(api_calls)
-            except:
-                api_calls = []
-        
-        # Count status codes
-        status_counts = defaultdict(int)
-        for call in api_calls:
-            status = call.get("status_code", "unknown")
-            status_counts[status] += 1
-        
-        error_500_count = status_counts[500]
-        
-        if error_500_count >= min_500_errors:
-            # Check for retry patterns
-            retry_patterns = 0
-            for i in range(len(api_calls) - 1):
-                if api_calls[i].get("status_code") == 500 and api_calls[i+1].get("status_code") == 200:
-                    retry_patterns += 1
-            
-            test_cases.append({
-                "date": log["date"],
-                "user_id": log["user_id"],
-                "user_email": user_map.get(log["user_id"], "Unknown"),
-                "500_errors": error_500_count,
-                "200_success": status_counts[200],
-                "404_no_data": status_counts[404],
-                "retry_patterns": retry_patterns,
-                "laughter_events": log.get("laughter_events_found", 0),
-                "duplicates_skipped": log.get("duplicates_skipped", 0),
-            })
+    print(f"   Found {total_logs} processing log(s)")
+    
+    # Compare against what actually ended up stored, in one batched query
+    _attach_detection_counts(supabase, test_cases, user_timezones, start_date, end_date)
     
     # Sort by 500 count
-    test_cases.sort(key=lambda x: x["500_errors"], reverse=True)
+    test_cases.sort(key=lambda x: x.errors_500, reverse=True)
     
     return test_cases
 
@@ -135,11 +245,11 @@ def main():
     
     print(f"\n✅ Found {len(test_cases)} day(s) with {args.min_500_errors}+ 500 errors:")
     print("\n" + "=" * 80)
-    print(f"{'Date':<12} {'User':<30} {'500 Errors':<12} {'200 Success':<12} {'Retry Patterns':<15} {'Laughter':<12}")
-    print("-" * 100)
+    print(f"{'Date':<12} {'User':<30} {'500 Errors':<12} {'200 Success':<12} {'Retry Patterns':<15} {'Laughter':<12} {'Stored':<8}")
+    print("-" * 108)
     
     for tc in test_cases:
-        print(f"{tc['date']:<12} {tc['user_email'][:29]:<30} {tc['500_errors']:<12} {tc['200_success']:<12} {tc['retry_patterns']:<15} {tc['laughter_events']:<12}")
+        print(f"{tc.date:<12} {tc.user_email[:29]:<30} {tc.errors_500:<12} {tc.success_200:<12} {tc.retry_patterns:<15} {tc.laughter_events:<12} {tc.detections_stored:<8}")
     
     # Best test candidates
     print("\n" + "=" * 80)
@@ -148,20 +258,21 @@ def main():
     
     # Prioritize: more 500 errors, fewer retry patterns (means retries might help)
     best_candidates = sorted(
-        [tc for tc in test_cases if tc['retry_patterns'] == 0],
-        key=lambda x: x['500_errors'],
+        [tc for tc in test_cases if tc.retry_patterns == 0],
+        key=lambda x: x.errors_500,
         reverse=True
     )[:5]
     
     if best_candidates:
         print("\n📋 Days with 500 errors but NO retry patterns (retries might help):")
         for i, tc in enumerate(best_candidates, 1):
-            print(f"\n   {i}. {tc['date']} - {tc['user_email'][:30]}")
-            print(f"      - 500 Errors: {tc['500_errors']}")
-            print(f"      - 200 Success: {tc['200_success']}")
-            print(f"      - Laughter Events: {tc['laughter_events']}")
+            print(f"\n   {i}. {tc.date} - {tc.user_email[:30]}")
+            print(f"      - 500 Errors: {tc.errors_500}")
+            print(f"      - 200 Success: {tc.success_200}")
+            print(f"      - Laughter Events: {tc.laughter_events}")
+            print(f"      - Detections Stored: {tc.detections_stored}")
             print(f"      - Test command:")
-            print(f"        python scripts/diagnostics/test_retry_methodical.py --date {tc['date']} --user-id {tc['user_id']}")
+            print(f"        python scripts/diagnostics/test_retry_methodical.py --date {tc.date} --user-id {tc.user_id}")
     else:
         print("\n⚠️  All days with 500 errors already have retry patterns")
         print("   This suggests retry logic is already deployed and working")
@@ -8,6 +8,8 @@ This will help us verify if YAMNet model reload is the right fix.
 import sys
 import os
 import gc
+import argparse
+import tracemalloc
 import psutil
 from pathlib import Path
 
@@ -34,50 +36,66 @@ def get_memory_mb():
     return process.memory_info().rss / 1024 / 1024
 
 
-def analyze_memory_objects():
-    """Analyze what Python objects are holding memory."""
-    try:
-        import tracemalloc
-        tracemalloc.start()
-        
-        # Get current memory
-        current, peak = tracemalloc.get_traced_memory()
-        print(f"Current memory: {current / 1024 / 1024:.1f} MB")
-        print(f"Peak memory: {peak / 1024 / 1024:.1f} MB")
-        
-        # Get top memory consumers
-        snapshot = tracemalloc.take_snapshot()
-        top_stats = snapshot.statistics('lineno')
-        
-        print("\nTop 10 memory consumers:")
-        for index, stat in enumerate(top_stats[:10], 1):
-            print(f"{index}. {stat}")
-        
-        tracemalloc.stop()
-    except ImportError:
-        print("⚠️ tracemalloc not available, using gc.get_objects()")
-        
-        # Fallback: count objects by type
-        objects = gc.get_objects()
-        type_counts = {}
-        for obj in objects:
-            obj_type = type(obj).__name__
-            type_counts[obj_type] = type_counts.get(obj_type, 0) + 1
-        
-        print("\nTop object types by count:")
-        for obj_type, count in sorted(type_counts.items(), key=lambda x: x[1], reverse=True)[:20]:
-            print(f"  {obj_type}: {count}")
+def analyze_memory_objects(key_type: str = "filename"):
+    """
+    Analyze what Python objects are holding memory.
+    
+    Reports the allocations traced since tracemalloc.start() (called at the
+    top of __main__, before TensorFlow/YAMNet are loaded) and stops tracing.
+    
+    Args:
+        key_type: tracemalloc grouping - "filename" (default, high-level view),
+            "lineno", or "traceback" (full allocation stacks; needs tracing
+            started with more than one frame)
+    """
+    # Aggregate counters are O(1) - never walk gc.get_objects(), which on a
+    # TensorFlow process materializes a list of millions of objects (seconds
+    # of CPU plus a large transient allocation inside a memory diagnostic)
+    print(f"GC generation counts: {gc.get_count()}")
+    print(f"Allocated memory blocks: {sys.getallocatedblocks():,}")
+    
+    if not tracemalloc.is_tracing():
+        print("⚠️ tracemalloc is not tracing - start it before the work to measure")
+        return
+    
+    # Get current memory
+    current, peak = tracemalloc.get_traced_memory()
+    print(f"Current memory: {current / 1024 / 1024:.1f} MB")
+    print(f"Peak memory: {peak / 1024 / 1024:.1f} MB")
+    
+    # Get top memory consumers
+    snapshot = tracemalloc.take_snapshot()
+    top_stats = snapshot.statistics(key_type)
+    
+    print(f"\nTop 10 memory consumers (by {key_type}):")
+    for index, stat in enumerate(top_stats[:10], 1):
+        print(f"{index}. {stat}")
+        if key_type == "traceback":
+            for line in stat.traceback.format():
+                print(f"      {line}")
+    
+    tracemalloc.stop()
 
 
 def check_yamnet_model():
     """Check if YAMNet model is loaded and its memory footprint."""
     try:
-        from src.services.yamnet_processor import yamnet_processor
-        
         print("\n" + "="*60)
         print("YAMNet Model Status")
         print("="*60)
         
+        # Import TF on its own first so its runtime cost is reported
+        # separately from the YAMNet weights (yamnet_processor loads the
+        # model at import time)
+        before_tf = get_memory_mb()
+        import tensorflow as tf  # noqa: F401
+        after_tf = get_memory_mb()
+        print(f"TensorFlow import: {after_tf - before_tf:+.1f} MB")
+        
+        from src.services.yamnet_processor import yamnet_processor
+        after_model = get_memory_mb()
+        print(f"YAMNet model load: {after_model - after_tf:+.1f} MB")
+        
         if yamnet_processor.model is None:
             print("❌ Model not loaded")
             return
@@ -94,13 +112,14 @@ def check_yamnet_model():
         except:
             print("⚠️ Could not determine model size")
         
-        # Check TensorFlow graph
+        # Check TensorFlow allocator state (TF2-native; the v1 graph/session
+        # APIs go through compat shims and say nothing useful in eager mode)
         try:
-            import tensorflow as tf
-            print(f"TensorFlow default graph: {tf.get_default_graph()}")
-            print(f"Active sessions: {len(tf.compat.v1.get_default_session() or [])}")
-        except:
-            print("⚠️ Could not check TensorFlow state")
+            memory_info = tf.config.experimental.get_memory_info("CPU:0")
+            print(f"TensorFlow CPU memory: current {memory_info['current'] / 1024 / 1024:.1f} MB, "
+                  f"peak {memory_info['peak'] / 1024 / 1024:.1f} MB")
+        except Exception:
+            print("⚠️ TensorFlow memory info not available for CPU:0")
             
     except Exception as e:
         print(f"❌ Error checking YAMNet model: {e}")
@@ -108,19 +127,25 @@ def check_yamnet_model():
         traceback.print_exc()
 
 
-def test_model_reload():
-    """Test if reloading model releases memory."""
+def test_model_reload(baseline=None):
+    """
+    Test if reloading model releases memory.
+    
+    Args:
+        baseline: Pre-TensorFlow RSS in MB; measured now if not given (which
+            undercounts model overhead when TF is already loaded)
+    """
     print("\n" + "="*60)
     print("Testing Model Reload")
     print("="*60)
     
-    baseline = get_memory_mb()
+    if baseline is None:
+        baseline = get_memory_mb()
     print(f"Baseline memory: {baseline:.1f} MB")
     
     try:
         from src.services.yamnet_processor import yamnet_processor
         import tensorflow as tf
-        import gc
         
         # Check memory with model loaded
         with_model = get_memory_mb()
@@ -133,11 +158,10 @@ def test_model_reload():
             del yamnet_processor.model
             yamnet_processor.model = None
         
-        # Clear TensorFlow
+        # Clear TensorFlow (clear_session also resets the Keras graph in TF2)
         tf.keras.backend.clear_session()
-        tf.compat.v1.reset_default_graph()
         
-        # Aggressive GC
+        # Aggressive GC - repeated passes to break TF's cyclic references
         for _ in range(10):
             gc.collect()
         
@@ -165,23 +189,52 @@ def test_model_reload():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Identify what's holding memory")
+    parser.add_argument(
+        "--traceback",
+        action="store_true",
+        help="Group tracemalloc statistics by full allocation traceback instead of by file",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=25,
+        help="Stack frames recorded per allocation with --traceback (default: 25)",
+    )
+    parser.add_argument(
+        "--no-tf",
+        action="store_true",
+        help="Skip the YAMNet/TensorFlow checks so TF is never imported",
+    )
+    args = parser.parse_args()
+    
+    # Capture RSS before anything pulls in TensorFlow, so the baseline isn't
+    # contaminated by the runtime we're trying to measure
+    baseline_rss = get_memory_mb()
+    
+    # Trace from here so the snapshot in analyze_memory_objects() covers the
+    # TensorFlow/YAMNet allocations, not just the few made right before it
+    tracemalloc.start(args.frames if args.traceback else 1)
+    
     print("="*60)
     print("Memory Diagnostic Tool")
     print("="*60)
     
-    print(f"\nCurrent memory: {get_memory_mb():.1f} MB")
+    print(f"\nBaseline memory (pre-TensorFlow): {baseline_rss:.1f} MB")
     
     # Check YAMNet model
-    check_yamnet_model()
+    if not args.no_tf:
+        check_yamnet_model()
     
     # Analyze memory objects
     print("\n" + "="*60)
     print("Memory Object Analysis")
     print("="*60)
-    analyze_memory_objects()
+    analyze_memory_objects("traceback" if args.traceback else "filename")
     
     # Test model reload
-    test_model_reload()
+    if not args.no_tf:
+        test_model_reload(baseline=baseline_rss)
     
     print("\n" + "="*60)
     print("Diagnostic Complete")
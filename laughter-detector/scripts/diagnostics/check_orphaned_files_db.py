@@ -5,7 +5,9 @@ Check if orphaned files have database records.
 This will help us understand why User 1 had 3 orphaned files.
 """
 
+import os
 import sys
+from collections import defaultdict
 from pathlib import Path
 
 # Add project root to path
@@ -47,19 +49,36 @@ def check_orphaned_files():
     print(f"User ID: {user_id[:8]}...")
     print(f"Files to check: {len(orphaned_files)}\n")
     
-    for filename in orphaned_files:
+    # Format: uploads/clips/{user_id}/{filename}
+    clip_paths = [f"uploads/clips/{user_id}/{filename}" for filename in orphaned_files]
+    
+    # One laughter_detections query for every file instead of one per file
+    result = (
+        supabase.table("laughter_detections")
+        .select("id, timestamp, clip_path")
+        .eq("user_id", user_id)
+        .in_("clip_path", clip_paths)
+        .execute()
+    )
+    records_by_path = defaultdict(list)
+    for record in result.data or []:
+        records_by_path[record["clip_path"]].append(record)
+    
+    # One directory read instead of a stat (plus Path allocation) per file
+    clips_dir = f"uploads/clips/{user_id}"
+    try:
+        with os.scandir(clips_dir) as entries:
+            files_on_disk = {entry.name for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        files_on_disk = set()
+    
+    for filename, clip_path in zip(orphaned_files, clip_paths):
         print(f"Checking: {filename}")
         
-        # Extract clip path (assuming standard format)
-        # Format: uploads/clips/{user_id}/{filename}
-        clip_path = f"uploads/clips/{user_id}/{filename}"
-        
-        # Check laughter_detections table
-        result = supabase.table("laughter_detections").select("id, timestamp, clip_path").eq("user_id", user_id).eq("clip_path", clip_path).execute()
-        
-        if result.data:
-            print(f"  ✅ Found {len(result.data)} record(s) in laughter_detections:")
-            for record in result.data:
+        records = records_by_path.get(clip_path)
+        if records:
+            print(f"  ✅ Found {len(records)} record(s) in laughter_detections:")
+            for record in records:
                 print(f"     - ID: {record['id']}")
                 print(f"       Timestamp: {record['timestamp']}")
                 print(f"       Clip path: {record['clip_path']}")
@@ -67,9 +86,8 @@ def check_orphaned_files():
             print(f"  ❌ No records found in laughter_detections")
         
         # Check if file exists on disk
-        file_path = Path("uploads/clips") / user_id / filename
-        if file_path.exists():
-            print(f"  ✅ File exists on disk: {file_path}")
+        if filename in files_on_disk:
+            print(f"  ✅ File exists on disk: {clips_dir}/{filename}")
         else:
             print(f"  ❌ File does NOT exist on disk")
         
@@ -7,8 +7,8 @@ This will help us understand why User 1 had 47 events and User 2 had 49.
 
 import sys
 from pathlib import Path
-from datetime import datetime
-import pytz
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
@@ -27,6 +27,14 @@ for env_path in env_paths:
         break
 
 from src.services.supabase_client import get_service_role_client
+from src.utils.timestamp_utils import UTC_SUFFIXES
+
+
+def _utc_hour(timestamp: str) -> int:
+    """UTC hour of an ISO timestamp - sliced straight from the string when it is already UTC."""
+    if timestamp.endswith(UTC_SUFFIXES):
+        return int(timestamp[11:13])
+    return datetime.fromisoformat(timestamp).astimezone(timezone.utc).hour
 
 
 def compare_detections():
@@ -36,11 +44,11 @@ def compare_detections():
     user2_id = "eb719f30-fe9e-42e4-8bb3-d5b4bb8b3327"
     
     # Nov 19 in America/Los_Angeles timezone
-    tz = pytz.timezone("America/Los_Angeles")
-    nov_19_start = tz.localize(datetime(2025, 11, 19, 0, 0, 0))
-    nov_19_end = tz.localize(datetime(2025, 11, 20, 0, 0, 0))
-    start_utc = nov_19_start.astimezone(pytz.UTC).isoformat()
-    end_utc = nov_19_end.astimezone(pytz.UTC).isoformat()
+    tz = ZoneInfo("America/Los_Angeles")
+    nov_19_start = datetime(2025, 11, 19, 0, 0, 0, tzinfo=tz)
+    nov_19_end = datetime(2025, 11, 20, 0, 0, 0, tzinfo=tz)
+    start_utc = nov_19_start.astimezone(timezone.utc).isoformat()
+    end_utc = nov_19_end.astimezone(timezone.utc).isoformat()
     
     supabase = get_service_role_client()
     
@@ -50,36 +58,44 @@ def compare_detections():
     print(f"Date range: Nov 19, 2025 (America/Los_Angeles)")
     print(f"UTC range: {start_utc} to {end_utc}\n")
     
-    # Get User 1 detections
-    user1_result = supabase.table("laughter_detections").select("id, timestamp, clip_path, created_at").eq("user_id", user1_id).gte("timestamp", start_utc).lt("timestamp", end_utc).order("timestamp").execute()
-    
-    # Get User 2 detections
-    user2_result = supabase.table("laughter_detections").select("id, timestamp, clip_path, created_at").eq("user_id", user2_id).gte("timestamp", start_utc).lt("timestamp", end_utc).order("timestamp").execute()
+    # Per-hour counts for both users, grouped in Postgres
+    # (hourly_detection_histogram RPC, scripts/setup/hourly_detection_histogram.sql)
+    by_hour = {user1_id: {}, user2_id: {}}
+    try:
+        histogram = supabase.rpc("hourly_detection_histogram", {
+            "user_ids": [user1_id, user2_id],
+            "start_ts": start_utc,
+            "end_ts": end_utc,
+        }).execute()
+        for row in histogram.data or []:
+            by_hour[row['user_id']][row['hour']] = row['n']
+    except Exception as e:
+        print(f"⚠️  hourly_detection_histogram RPC unavailable, grouping detections locally: {e}\n")
+        # Get both users' detections in one query and split them by user
+        # (only the timestamp is used - for the hour bucket and the totals)
+        detections_result = supabase.table("laughter_detections").select("user_id, timestamp").in_("user_id", [user1_id, user2_id]).gte("timestamp", start_utc).lt("timestamp", end_utc).order("timestamp").execute()
+        for det in detections_result.data:
+            hour = _utc_hour(det['timestamp'])
+            user_by_hour = by_hour[det['user_id']]
+            user_by_hour[hour] = user_by_hour.get(hour, 0) + 1
+    user1_by_hour = by_hour[user1_id]
+    user2_by_hour = by_hour[user2_id]
+    user1_total = sum(user1_by_hour.values())
+    user2_total = sum(user2_by_hour.values())
     
     print(f"User 1 ({user1_id[:8]}...):")
-    print(f"  Total detections: {len(user1_result.data)}")
+    print(f"  Total detections: {user1_total}")
     
     print(f"\nUser 2 ({user2_id[:8]}...):")
-    print(f"  Total detections: {len(user2_result.data)}")
+    print(f"  Total detections: {user2_total}")
     
-    print(f"\nDifference: {len(user2_result.data) - len(user1_result.data)} events")
+    print(f"\nDifference: {user2_total - user1_total} events")
     
     # Group by hour to see patterns
     print("\n" + "="*60)
     print("Detections by Hour (UTC)")
     print("="*60)
     
-    user1_by_hour = {}
-    user2_by_hour = {}
-    
-    for det in user1_result.data:
-        hour = datetime.fromisoformat(det['timestamp'].replace('Z', '+00:00')).hour
-        user1_by_hour[hour] = user1_by_hour.get(hour, 0) + 1
-    
-    for det in user2_result.data:
-        hour = datetime.fromisoformat(det['timestamp'].replace('Z', '+00:00')).hour
-        user2_by_hour[hour] = user2_by_hour.get(hour, 0) + 1
-    
     all_hours = sorted(set(list(user1_by_hour.keys()) + list(user2_by_hour.keys())))
     
     print(f"{'Hour (UTC)':<12} {'User 1':<10} {'User 2':<10} {'Diff':<10}")
@@ -95,18 +111,23 @@ def compare_detections():
     print("Processing Logs")
     print("="*60)
     
-    user1_logs = supabase.table("processing_logs").select("*").eq("user_id", user1_id).eq("date", "2025-11-19").execute()
-    user2_logs = supabase.table("processing_logs").select("*").eq("user_id", user2_id).eq("date", "2025-11-19").execute()
+    # Both users' logs in one query, only the printed columns
+    logs_result = supabase.table("processing_logs").select("user_id, trigger_type, laughter_events_found, duplicates_skipped, created_at").in_("user_id", [user1_id, user2_id]).eq("date", "2025-11-19").execute()
+    logs_by_user = {user1_id: [], user2_id: []}
+    for log in logs_result.data:
+        logs_by_user[log['user_id']].append(log)
+    user1_logs = logs_by_user[user1_id]
+    user2_logs = logs_by_user[user2_id]
     
-    print(f"User 1 processing logs: {len(user1_logs.data)}")
-    for log in user1_logs.data:
+    print(f"User 1 processing logs: {len(user1_logs)}")
+    for log in user1_logs:
         print(f"  - Trigger: {log.get('trigger_type')}")
         print(f"    Events found: {log.get('laughter_events_found')}")
         print(f"    Duplicates skipped: {log.get('duplicates_skipped')}")
         print(f"    Created: {log.get('created_at')}")
     
-    print(f"\nUser 2 processing logs: {len(user2_logs.data)}")
-    for log in user2_logs.data:
+    print(f"\nUser 2 processing logs: {len(user2_logs)}")
+    for log in user2_logs:
         print(f"  - Trigger: {log.get('trigger_type')}")
         print(f"    Events found: {log.get('laughter_events_found')}")
         print(f"    Duplicates skipped: {log.get('duplicates_skipped')}")
@@ -0,0 +1,222 @@
+"""
+Pure helpers for check_user_processing_status.py: timezone ranges, segment
+duration sums, API call breakdowns and display formatting.
+
+Nothing here talks to Supabase - see user_status_queries.py for the reads.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from typing import Optional, Dict, Any, List, Tuple
+
+from src.utils.timestamp_utils import parse_timestamp
+
+
+@lru_cache(maxsize=32)
+def _tz(name: str) -> ZoneInfo:
+    """Return the ZoneInfo for an IANA name (cached - zones never change during a run)."""
+    return ZoneInfo(name)
+
+
+@lru_cache(maxsize=64)
+def get_utc_range(date: Optional[str], user_timezone: str = 'UTC') -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Convert a calendar date in the user's timezone to a UTC range.
+    
+    Cached by (date, user_timezone) - callers looping over users for the same
+    date reuse the result instead of re-parsing and re-localizing.
+    
+    Matches the API's approach in src/api/data_routes.py get_laughter_detections():
+    midnight-to-midnight in the user's timezone, not UTC.
+    Example: Nov 3 PST (UTC-8) = Nov 3 00:00 PST to Nov 4 00:00 PST = Nov 3 08:00 UTC to Nov 4 08:00 UTC
+    
+    Args:
+        date: Optional date in YYYY-MM-DD format (None means all dates)
+        user_timezone: User's timezone (IANA string, e.g., 'America/Los_Angeles')
+    
+    Returns:
+        (start_utc, end_utc), or (None, None) if no date given
+    """
+    if not date:
+        return None, None
+    
+    user_tz = _tz(user_timezone)
+    # Parse date as midnight in user's timezone
+    start_naive = datetime.strptime(date, "%Y-%m-%d")
+    start_of_day_local = start_naive.replace(tzinfo=user_tz)
+    # Attach the zone to the next midnight separately so its UTC offset is resolved on
+    # its own (the two differ on DST change days)
+    end_of_day_local = (start_naive + timedelta(days=1)).replace(tzinfo=user_tz)
+    # Convert to UTC for database query (all timestamps stored in UTC)
+    return start_of_day_local.astimezone(timezone.utc), end_of_day_local.astimezone(timezone.utc)
+
+
+def group_detections_by_date(detections: List[Dict[str, Any]], user_timezone: str = 'UTC') -> Dict[str, int]:
+    """
+    Count detections per calendar day in the user's timezone.
+    
+    Matches src/api/data_routes.py get_daily_summary(): UTC timestamps are
+    converted to the user's timezone before taking the date.
+    
+    Returns:
+        Dictionary of YYYY-MM-DD -> detection count
+    """
+    user_tz = _tz(user_timezone)
+    return dict(Counter(
+        parse_timestamp(det['timestamp']).astimezone(user_tz).strftime('%Y-%m-%d')
+        for det in detections
+    ))
+
+
+def build_duration_info(total_seconds: float, processed_seconds: float, unprocessed_seconds: float,
+                        total_count: int, processed_count: int) -> Dict[str, Any]:
+    """Build the duration/count dictionary printed in the audio segments section."""
+    return {
+        'total_count': total_count,
+        'processed_count': processed_count,
+        'total_seconds': total_seconds,
+        'total_minutes': total_seconds / 60,
+        'total_hours': total_seconds / 3600,
+        'processed_seconds': processed_seconds,
+        'processed_minutes': processed_seconds / 60,
+        'unprocessed_seconds': unprocessed_seconds,
+        'unprocessed_minutes': unprocessed_seconds / 60
+    }
+
+
+def summarize_segments(segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Segment counts and total duration computed locally from segment rows.
+    
+    DATA SOURCE: audio_segments table
+    - Reads start_time and end_time fields (UTC timestamps)
+    - Calculates duration as (end_time - start_time) for each segment
+    - Sums all segment durations to get total recording time
+    - NOT stored in database - computed on-the-fly
+    
+    Returns:
+        Same dictionary as build_duration_info()
+    """
+    processed_seconds = 0.0
+    unprocessed_seconds = 0.0
+    processed_count = 0
+    
+    for seg in segments:
+        if seg.get('processed', False):
+            processed_count += 1
+        try:
+            duration = (parse_timestamp(seg['end_time']) - parse_timestamp(seg['start_time'])).total_seconds()
+        except Exception as e:
+            print(f"⚠️  Error calculating duration for segment {seg.get('id')}: {e}")
+            continue
+        if seg.get('processed', False):
+            processed_seconds += duration
+        else:
+            unprocessed_seconds += duration
+    
+    return build_duration_info(
+        processed_seconds + unprocessed_seconds,
+        processed_seconds,
+        unprocessed_seconds,
+        len(segments),
+        processed_count,
+    )
+
+
+def summarize_segments_by_date(segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Same rows as the audio_segments_by_date() RPC, computed locally from segment rows.
+    
+    Single pass: each segment's timestamps are parsed once and accumulated into
+    its date bucket, instead of grouping first and re-scanning every bucket.
+    """
+    buckets = {}  # date -> [segment_count, processed_count, total_seconds]
+    for seg in segments:
+        seg_date = seg.get('date')
+        if not isinstance(seg_date, str):
+            # Handle datetime objects
+            if not hasattr(seg_date, 'strftime'):
+                continue
+            seg_date = seg_date.strftime('%Y-%m-%d')
+        
+        bucket = buckets.setdefault(seg_date, [0, 0, 0.0])
+        bucket[0] += 1
+        if seg.get('processed', False):
+            bucket[1] += 1
+        try:
+            bucket[2] += (parse_timestamp(seg['end_time']) - parse_timestamp(seg['start_time'])).total_seconds()
+        except Exception as e:
+            print(f"⚠️  Error calculating duration for segment {seg.get('id')}: {e}")
+    
+    return [
+        {'date': seg_date, 'segment_count': count, 'processed_count': processed, 'total_s': total_s}
+        for seg_date, (count, processed, total_s) in sorted(buckets.items())
+    ]
+
+
+def format_duration(seconds: float) -> str:
+    """Format duration in human-readable format."""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    elif seconds < 3600:
+        return f"{seconds/60:.1f}m"
+    else:
+        hours = int(seconds // 3600)
+        minutes = int((seconds % 3600) // 60)
+        return f"{hours}h {minutes}m"
+
+
+def analyze_api_calls(api_calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Analyze Limitless API calls from processing logs.
+    
+    Categorizes API calls by HTTP status code:
+    - 200: Success - audio data returned (counted in 'audio_files_downloaded')
+    - 404: No data - no audio available for time window (normal, not an error)
+    - 5xx: Server errors - API or gateway issues
+    
+    Returns:
+        Dictionary with total_calls, successful (200), failed (404/5xx), and status breakdown
+    """
+    if not api_calls:
+        return {'total_calls': 0, 'successful': 0, 'failed': 0, 'statuses': {}}
+    
+    # OPTIMIZATION: Counter builds the histogram in C; success/failure is then
+    # derived from the (few) distinct status codes instead of every call
+    statuses = Counter(call.get('status_code', 'unknown') for call in api_calls)
+    # 200 = audio data successfully downloaded; calls without a status_code count as failed
+    successful = sum(n for status, n in statuses.items() if isinstance(status, int) and 200 <= status < 300)
+    
+    return {
+        'total_calls': len(api_calls),  # All HTTP requests to Limitless API
+        'successful': successful,  # 200 responses (audio files)
+        'failed': len(api_calls) - successful,  # 404 (no data) + 5xx (errors)
+        'statuses': dict(statuses)  # Breakdown by HTTP status code
+    }
+
+
+def analyze_api_call_statuses(statuses: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Same result as analyze_api_calls(), built from the pre-aggregated
+    api_call_statuses column of the processing_logs_api_summary view.
+    
+    jsonb object keys are always text, so numeric status codes are turned back
+    into ints to keep the printed breakdown identical to the raw-array path.
+    
+    Returns:
+        Dictionary with total_calls, successful (200), failed (404/5xx), and status breakdown
+    """
+    counts = {
+        int(status) if status.isdigit() else status: n
+        for status, n in (statuses or {}).items()
+    }
+    total = sum(counts.values())
+    successful = sum(n for status, n in counts.items() if isinstance(status, int) and 200 <= status < 300)
+    return {
+        'total_calls': total,
+        'successful': successful,
+        'failed': total - successful,
+        'statuses': counts,
+    }
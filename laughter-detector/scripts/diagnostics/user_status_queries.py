@@ -0,0 +1,458 @@
+"""
+Supabase reads for check_user_processing_status.py.
+
+Each source has at most one server-side shortcut and one fallback:
+- user_processing_status(_many) RPC -> per-table queries (users, limitless_keys,
+  audio_segments rows, laughter_detections rows)
+- audio_segments_by_date(_many) RPC -> grouping audio_segments rows locally
+- processing_logs_api_summary view -> raw processing_logs table
+
+The SQL lives in scripts/setup/ (user_processing_status.sql,
+audio_segments_by_date.sql, processing_logs_api_summary.sql).
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Optional, Dict, Any, List, Union
+
+from user_status_metrics import (
+    get_utc_range,
+    group_detections_by_date,
+    build_duration_info,
+    summarize_segments,
+    summarize_segments_by_date,
+)
+
+PROCESSING_LOGS_PAGE_SIZE = 100
+
+# Columns the summary prints (api_calls / api_call_statuses added per source below)
+PROCESSING_LOG_COLUMNS = (
+    'date, status, message, trigger_type, processing_duration_seconds, '
+    'audio_files_downloaded, laughter_events_found, duplicates_skipped, '
+    'last_processed, error_details'
+)
+
+# PostgREST / Postgres error codes for "relation does not exist"
+_MISSING_RELATION_CODES = ('PGRST205', '42P01')
+
+# Set once the processing_logs_api_summary view (scripts/setup/processing_logs_api_summary.sql)
+# turns out to be missing, so later pages go straight to the raw table
+_api_summary_view_missing = False
+
+
+def get_user_processing_status(supabase, user_id: str, date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Get user info, key counts, segment summary and detection counts in one call.
+    
+    Uses the user_processing_status() RPC (scripts/setup/user_processing_status.sql).
+    
+    Args:
+        supabase: Supabase client
+        user_id: User UUID
+        date: Optional date in YYYY-MM-DD format (interpreted in the user's timezone)
+    
+    Returns:
+        Dictionary with user_info (None if user not found), key_info,
+        segment_summary and detections_by_date, or None if the RPC is unavailable
+    """
+    try:
+        result = supabase.rpc('user_processing_status', {'uid': user_id, 'd': date}).execute()
+    except Exception as e:
+        print(f"⚠️  user_processing_status RPC unavailable, querying each table: {e}")
+        return None
+    
+    return _parse_processing_status(result.data or {})
+
+
+def get_users_processing_status(supabase, user_ids: List[str], date: Optional[str] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Same as get_user_processing_status() for several users in one round trip.
+    
+    Uses the user_processing_status_many() RPC (scripts/setup/user_processing_status.sql).
+    
+    Returns:
+        Dictionary of user_id -> status dictionary, or None if the RPC is unavailable
+    """
+    try:
+        result = supabase.rpc('user_processing_status_many', {'uids': user_ids, 'd': date}).execute()
+    except Exception as e:
+        print(f"⚠️  user_processing_status_many RPC unavailable, querying each user separately: {e}")
+        return None
+    return {str(row['user_id']): _parse_processing_status(row.get('status') or {}) for row in result.data or []}
+
+
+def _parse_processing_status(status: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert the user_processing_status() JSON object into the dictionaries print_user_summary() uses."""
+    keys = status.get('keys') or {}
+    segments = status.get('segments') or {}
+    total_keys = int(keys.get('total_keys') or 0)
+    active_keys = int(keys.get('active_keys') or 0)
+    return {
+        'user_info': status.get('user'),
+        'key_info': {
+            'has_key': total_keys > 0,
+            'is_active': active_keys > 0,
+            'total_keys': total_keys,
+            'active_keys': active_keys
+        },
+        'segment_summary': build_duration_info(
+            float(segments.get('total_s') or 0),
+            float(segments.get('processed_s') or 0),
+            float(segments.get('unprocessed_s') or 0),
+            int(segments.get('total_count') or 0),
+            int(segments.get('processed_count') or 0),
+        ),
+        'detections_by_date': {day: int(n) for day, n in (status.get('detections_by_date') or {}).items()},
+    }
+
+
+def get_user_info(supabase, user_id: str) -> Optional[Dict[str, Any]]:
+    """Get user information from database."""
+    try:
+        result = supabase.table('users').select('id, email, timezone, is_active').eq('id', user_id).execute()
+        if result.data:
+            return result.data[0]
+        return None
+    except Exception as e:
+        print(f"❌ Error fetching user info: {e}")
+        return None
+
+
+def check_limitless_key(supabase, user_id: str) -> Dict[str, Any]:
+    """Check if user has an active Limitless API key."""
+    try:
+        result = supabase.table('limitless_keys').select('id, is_active, created_at').eq('user_id', user_id).execute()
+        if result.data:
+            active_keys = [k for k in result.data if k.get('is_active', False)]
+            return {
+                'has_key': True,
+                'is_active': len(active_keys) > 0,
+                'total_keys': len(result.data),
+                'active_keys': len(active_keys)
+            }
+        return {'has_key': False, 'is_active': False, 'total_keys': 0, 'active_keys': 0}
+    except Exception as e:
+        print(f"⚠️  Error checking Limitless key: {e}")
+        return {'has_key': False, 'is_active': False, 'error': str(e)}
+
+
+def get_audio_segments(supabase, user_id: str, date: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Get audio segments for user, optionally filtered by date.
+    
+    TIMEZONE HANDLING:
+    - audio_segments.date field is already stored in user's timezone (calendar date)
+    - Direct date comparison works - no conversion needed
+    
+    Returns:
+        List of audio segment dictionaries
+    """
+    try:
+        # Only the columns the summary prints/aggregates (skips file_path etc.)
+        query = supabase.table('audio_segments').select('id, date, start_time, end_time, processed').eq('user_id', user_id).order('date')
+        
+        if date:
+            query = query.eq('date', date)
+        
+        result = query.execute()
+        return result.data or []
+    except Exception as e:
+        print(f"❌ Error fetching audio segments: {e}")
+        return []
+
+
+def _is_missing_relation(error: Exception) -> bool:
+    """True if a PostgREST error means the table/view is not deployed (not a timeout or 5xx)."""
+    code = getattr(error, 'code', None)
+    return code in _MISSING_RELATION_CODES or any(c in str(error) for c in _MISSING_RELATION_CODES)
+
+
+def fetch_processing_logs_page(supabase, user_id: Union[str, List[str]], date: Optional[str] = None, offset: int = 0,
+                               page_size: int = PROCESSING_LOGS_PAGE_SIZE) -> List[Dict[str, Any]]:
+    """
+    Get one page of processing logs for user(s), optionally filtered by date.
+    
+    TIMEZONE HANDLING:
+    - processing_logs.date field is already stored in user's timezone (calendar date)
+    - Direct date comparison works - no conversion needed
+    
+    Args:
+        supabase: Supabase client
+        user_id: User UUID, or a list of UUIDs (rows then include user_id)
+        date: Optional date in YYYY-MM-DD format (matches processing_logs.date field)
+        offset: Row offset of the page
+        page_size: Maximum rows in the page
+    
+    Returns:
+        List of processing log dictionaries (at most page_size)
+    """
+    global _api_summary_view_missing
+    
+    def fetch(table: str, columns: str) -> List[Dict[str, Any]]:
+        if isinstance(user_id, list):
+            query = supabase.table(table).select(f"user_id, {columns}").in_('user_id', user_id)
+        else:
+            query = supabase.table(table).select(columns).eq('user_id', user_id)
+        query = query.order('date', desc=True).order('id')
+        if date:
+            query = query.eq('date', date)
+        result = query.range(offset, offset + page_size - 1).execute()
+        return result.data or []
+    
+    if not _api_summary_view_missing:
+        try:
+            # OPTIMIZATION: The view ships a small {status_code: count} object per log
+            # instead of the api_calls array (one JSON object per Limitless HTTP call)
+            return fetch('processing_logs_api_summary', f"{PROCESSING_LOG_COLUMNS}, api_call_statuses")
+        except Exception as e:
+            # Fall back to the raw api_calls array for this page; only stop trying
+            # the view if it is not deployed - a timeout or 5xx shouldn't disable
+            # it for the rest of the run
+            if _is_missing_relation(e):
+                _api_summary_view_missing = True
+    
+    try:
+        return fetch('processing_logs', f"{PROCESSING_LOG_COLUMNS}, api_calls")
+    except Exception as e:
+        print(f"❌ Error fetching processing logs: {e}")
+        return []
+
+
+def iter_processing_logs(supabase, user_id: str, date: Optional[str] = None,
+                         first_page: Optional[List[Dict[str, Any]]] = None):
+    """
+    Yield processing logs one at a time, fetching a page at a time.
+    
+    Keeps memory at one page of logs (each may carry large error_details
+    JSON, and api_calls when the summary view is missing) rather than the
+    user's whole history.
+    
+    Args:
+        supabase: Supabase client
+        user_id: User UUID
+        date: Optional date in YYYY-MM-DD format (matches processing_logs.date field)
+        first_page: Already-fetched page at offset 0, if any
+    
+    Yields:
+        Processing log dictionaries, newest date first
+    """
+    offset = 0
+    page = first_page if first_page is not None else fetch_processing_logs_page(supabase, user_id, date, offset)
+    while page:
+        yield from page
+        if len(page) < PROCESSING_LOGS_PAGE_SIZE:
+            break
+        offset += PROCESSING_LOGS_PAGE_SIZE
+        page = fetch_processing_logs_page(supabase, user_id, date, offset)
+
+
+def get_processing_logs_by_user(supabase, user_ids: List[str], date: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get processing logs for several users with one paginated in_() query.
+    
+    REUSES PATTERN: Same pagination logic as src/api/data_routes.py get_daily_summary()
+    
+    Returns:
+        Dictionary of user_id -> processing logs, newest date first
+    """
+    page_size = 1000
+    offset = 0
+    logs_by_user = defaultdict(list)
+    while True:
+        page = fetch_processing_logs_page(supabase, user_ids, date, offset, page_size=page_size)
+        for log in page:
+            logs_by_user[log['user_id']].append(log)
+        if len(page) < page_size:
+            break
+        offset += page_size
+    return logs_by_user
+
+
+def get_laughter_daily_counts(supabase, user_id: str, date: Optional[str] = None, user_timezone: str = 'UTC') -> Dict[str, int]:
+    """
+    Count laughter detections per calendar day in the user's timezone.
+    
+    Fallback for when the user_processing_status RPC is not installed.
+    
+    TIMEZONE HANDLING:
+    - If date is provided, converts user timezone date to UTC range for database query
+    - Matches the approach in src/api/data_routes.py get_laughter_detections()
+    - Days are bucketed in the user's timezone (matches get_daily_summary())
+    
+    PAGINATION:
+    - Supabase limits to 1000 records by default, so we paginate to get all records
+    - Keyset pagination on id (id > last seen id) rather than OFFSET, so each
+      page is an index seek instead of Postgres re-scanning every skipped row
+    
+    Returns:
+        Dictionary of YYYY-MM-DD -> detection count
+    """
+    start_of_day_utc, end_of_day_utc = get_utc_range(date, user_timezone)
+    
+    def base_query(columns: str, **select_kwargs):
+        query = supabase.table('laughter_detections').select(columns, **select_kwargs).eq('user_id', user_id)
+        if date:
+            query = query.gte('timestamp', start_of_day_utc.isoformat()).lt('timestamp', end_of_day_utc.isoformat())
+        return query
+    
+    try:
+        if date:
+            # One day only needs a count - no need to download the rows
+            result = base_query('id', count='exact').range(0, 0).execute()
+            return {date: result.count} if result.count else {}
+        
+        page_size = 1000
+        last_id = None
+        all_detections = []
+        while True:
+            query = base_query('id, timestamp').order('id').limit(page_size)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            page = query.execute().data or []
+            all_detections.extend(page)
+            if len(page) < page_size:
+                break
+            last_id = page[-1]['id']
+    except Exception as e:
+        print(f"❌ Error fetching laughter detections: {e}")
+        return {}
+    
+    return group_detections_by_date(all_detections, user_timezone)
+
+
+def get_segments_by_date_summary(supabase, user_id: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Get per-date segment counts and recording duration computed in Postgres.
+    
+    Uses the audio_segments_by_date() RPC (scripts/setup/audio_segments_by_date.sql):
+    one GROUP BY date row per day instead of every segment.
+    
+    Returns:
+        List of {date, segment_count, processed_count, total_s} sorted by date,
+        or None if the RPC is unavailable
+    """
+    try:
+        result = supabase.rpc('audio_segments_by_date', {'uid': user_id}).execute()
+    except Exception as e:
+        print(f"⚠️  audio_segments_by_date RPC unavailable, grouping segments locally: {e}")
+        return None
+    return result.data or []
+
+
+def get_segments_by_date_summaries(supabase, user_ids: List[str]) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """
+    Same as get_segments_by_date_summary() for several users in one round trip.
+    
+    Uses the audio_segments_by_date_many() RPC (scripts/setup/audio_segments_by_date.sql),
+    paged so PostgREST's max-rows cap can't silently truncate the (user, date) rows.
+    
+    REUSES PATTERN: Same pagination logic as src/api/data_routes.py get_daily_summary()
+    
+    Returns:
+        Dictionary of user_id -> per-date rows sorted by date, or None if the RPC is unavailable
+    """
+    page_size = 1000
+    offset = 0
+    by_user = defaultdict(list)
+    while True:
+        try:
+            result = supabase.rpc('audio_segments_by_date_many', {
+                'uids': user_ids,
+                'row_limit': page_size,
+                'row_offset': offset,
+            }).execute()
+        except Exception as e:
+            print(f"⚠️  audio_segments_by_date_many RPC unavailable, querying each user separately: {e}")
+            return None
+        page = result.data or []
+        for row in page:
+            by_user[str(row['user_id'])].append(row)
+        if len(page) < page_size:
+            break
+        offset += page_size
+    return by_user
+
+
+async def _none():
+    return None
+
+
+async def load_user_status(supabase, user_id: str, date: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Fetch everything print_user_summary() shows for one user.
+    
+    The reads are independent round trips, so they run concurrently (the sync
+    client blocks, hence worker threads). Processing logs are returned as a
+    lazy iterator: the first page is prefetched alongside, the rest are
+    fetched while printing.
+    
+    Returns:
+        Dictionary with user_info (None if user not found), key_info,
+        segment_summary, segments_by_date (None for a single date),
+        detections_by_date and logs
+    """
+    status, segments_by_date, first_log_page = await asyncio.gather(
+        asyncio.to_thread(get_user_processing_status, supabase, user_id, date),
+        asyncio.to_thread(get_segments_by_date_summary, supabase, user_id) if not date else _none(),
+        asyncio.to_thread(fetch_processing_logs_page, supabase, user_id, date, 0),
+    )
+    logs = iter_processing_logs(supabase, user_id, date, first_page=first_log_page)
+    
+    if status is not None and (segments_by_date is not None or date):
+        return {**status, 'segments_by_date': segments_by_date, 'logs': logs}
+    
+    segments = None
+    if status is None:
+        # RPC not installed - one request per table
+        user_info, key_info, segments = await asyncio.gather(
+            asyncio.to_thread(get_user_info, supabase, user_id),
+            asyncio.to_thread(check_limitless_key, supabase, user_id),
+            asyncio.to_thread(get_audio_segments, supabase, user_id, date),
+        )
+        detections_by_date = {}
+        if user_info:
+            # Detections wait on the user's timezone
+            detections_by_date = await asyncio.to_thread(
+                get_laughter_daily_counts, supabase, user_id, date, user_info.get('timezone', 'UTC'))
+        status = {
+            'user_info': user_info,
+            'key_info': key_info,
+            'segment_summary': summarize_segments(segments),
+            'detections_by_date': detections_by_date,
+        }
+    
+    if segments_by_date is None and not date:
+        if segments is None:
+            segments = await asyncio.to_thread(get_audio_segments, supabase, user_id, date)
+        segments_by_date = summarize_segments_by_date(segments)
+    
+    return {**status, 'segments_by_date': segments_by_date, 'logs': logs}
+
+
+async def prefetch_user_statuses(supabase, user_ids: List[str], date: Optional[str] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Same as load_user_status() for several users at once.
+    
+    One batched request per source (status RPC, per-date segments RPC,
+    processing logs via in_()) instead of one set of requests per user.
+    
+    Returns:
+        Dictionary of user_id -> load_user_status() result, or None if the
+        batch RPCs are unavailable (callers then load each user separately)
+    """
+    statuses, segments_by_date, logs_by_user = await asyncio.gather(
+        asyncio.to_thread(get_users_processing_status, supabase, user_ids, date),
+        asyncio.to_thread(get_segments_by_date_summaries, supabase, user_ids) if not date else _none(),
+        asyncio.to_thread(get_processing_logs_by_user, supabase, user_ids, date),
+    )
+    if statuses is None or (segments_by_date is None and not date):
+        return None
+    
+    return {
+        user_id: {
+            **status,
+            'segments_by_date': segments_by_date.get(user_id, []) if not date else None,
+            'logs': logs_by_user.get(user_id, []),
+        }
+        for user_id, status in statuses.items()
+    }
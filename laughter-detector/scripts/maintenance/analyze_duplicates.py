@@ -5,37 +5,46 @@ Analyze duplicate detections to understand what's happening.
 
 import os
 import sys
-from datetime import datetime, timedelta
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from supabase import create_client
-import pytz
+from zoneinfo import ZoneInfo
+from bisect import bisect_right
+from pathlib import Path
 from collections import defaultdict
+import numpy as np
+
+# Add project root to path so the shared src.utils helpers can be imported
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.timestamp_utils import parse_timestamp
 
 load_dotenv()
 
-# Get user ID
+# One client for every query below
+supabase = create_client(
+    os.getenv('SUPABASE_URL'), 
+    os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+)
+
+# Get user ID and timezone (one users query either way)
 user_id = os.getenv('TEST_USER_ID')
 if not user_id:
-    supabase = create_client(
-        os.getenv('SUPABASE_URL'), 
-        os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-    )
-    users = supabase.table('users').select('id, email').order('created_at', desc=True).limit(1).execute()
+    users = supabase.table('users').select('id, email, timezone').order('created_at', desc=True).limit(1).execute()
     if users.data:
         user_id = users.data[0]['id']
+        user_timezone = users.data[0].get('timezone') or 'UTC'
         print(f"Using user: {users.data[0]['email']} ({user_id})")
     else:
         print("ERROR: No users found")
         sys.exit(1)
-
-# Get user timezone
-supabase = create_client(
-    os.getenv('SUPABASE_URL'), 
-    os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-)
-user_result = supabase.table('users').select('timezone').eq('id', user_id).execute()
-timezone = user_result.data[0].get('timezone', 'UTC') if user_result.data else 'UTC'
-user_tz = pytz.timezone(timezone)
+else:
+    user_result = supabase.table('users').select('timezone').eq('id', user_id).execute()
+    user_timezone = (user_result.data[0].get('timezone') if user_result.data else None) or 'UTC'
+user_tz = ZoneInfo(user_timezone)
 
 # Check processing logs
 print("\n📋 Processing Logs Analysis:")
@@ -74,29 +83,60 @@ end_date_str = "2025-10-30"
 start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
 end_date = datetime.strptime(end_date_str, '%Y-%m-%d')
 
-start_date = user_tz.localize(start_date)
-end_date = user_tz.localize(end_date)
+start_date = start_date.replace(tzinfo=user_tz)
+end_date = end_date.replace(tzinfo=user_tz)
 
 start_time = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
 end_time = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
 
-start_utc = start_time.astimezone(pytz.UTC)
-end_utc = end_time.astimezone(pytz.UTC)
+start_utc = start_time.astimezone(timezone.utc)
+end_utc = end_time.astimezone(timezone.utc)
 
 # Get all detections
-detections_result = supabase.table("laughter_detections").select(
-    "id, timestamp, probability, audio_segment_id"
-).eq("user_id", user_id).gte("timestamp", start_utc.isoformat()).lte("timestamp", end_utc.isoformat()).execute()
+# Paginated: a single request is silently capped at PostgREST's max rows (1000).
+# Only timestamps are needed - the per-day counts and the 5-second window
+# analysis below both work from them
+page_size = 1000
+
+
+def detections_query(columns, **select_kwargs):
+    return supabase.table("laughter_detections").select(columns, **select_kwargs).eq(
+        "user_id", user_id
+    ).gte("timestamp", start_utc.isoformat()).lte("timestamp", end_utc.isoformat())
 
-detections = detections_result.data if detections_result.data else []
+
+def fetch_detections_page(page):
+    return detections_query("id, timestamp").order("id").range(
+        page * page_size, (page + 1) * page_size - 1
+    ).execute().data or []
+
+
+# Count first (range(0, 0) keeps the body to at most one row), then fetch the
+# pages concurrently - no trailing empty-page request, and an empty window
+# costs only the count
+total_detections = detections_query("id", count="exact").range(0, 0).execute().count or 0
+detections = []
+with ThreadPoolExecutor(max_workers=4) as executor:
+    for page_data in executor.map(fetch_detections_page, range(math.ceil(total_detections / page_size))):
+        detections.extend(page_data)
 
 # Group by date
+# Each local day is bucketed by comparing the UTC epoch against that day's local
+# midnight, so no per-row astimezone()/strftime() is needed. Each midnight gets
+# its own UTC offset, so the buckets stay correct across a DST change
+day_keys = []
+day_starts = []
+day = start_date.replace(tzinfo=None)
+while day <= end_date.replace(tzinfo=None):
+    day_keys.append(day.strftime('%Y-%m-%d'))
+    day_starts.append(day.replace(tzinfo=user_tz).timestamp())
+    day += timedelta(days=1)
+
 by_date = defaultdict(list)
 for det in detections:
-    ts = datetime.fromisoformat(det["timestamp"].replace('Z', '+00:00'))
-    ts_local = ts.astimezone(user_tz)
-    date_key = ts_local.strftime('%Y-%m-%d')
-    by_date[date_key].append(det)
+    epoch = parse_timestamp(det["timestamp"]).timestamp()
+    day_index = bisect_right(day_starts, epoch) - 1
+    by_date[day_keys[day_index]].append((epoch, det))
 
 print(f"\n✅ Stored in laughter_detections table:")
 for date_key in sorted(by_date.keys()):
@@ -104,25 +144,19 @@ for date_key in sorted(by_date.keys()):
     print(f"\n  {date_key}: {len(detections_for_date)} detections stored")
     
     # Check for potential duplicates (within 5 seconds)
-    sorted_dets = sorted(detections_for_date, key=lambda x: x["timestamp"])
-    duplicate_groups = []
-    for i, det1 in enumerate(sorted_dets):
-        ts1 = datetime.fromisoformat(det1["timestamp"].replace('Z', '+00:00'))
-        nearby = []
-        for det2 in sorted_dets[i+1:]:
-            ts2 = datetime.fromisoformat(det2["timestamp"].replace('Z', '+00:00'))
-            diff = abs((ts2 - ts1).total_seconds())
-            if diff <= 5:
-                nearby.append(det2)
-        if nearby:
-            duplicate_groups.append((det1, nearby))
+    # Vectorized over the sorted epochs (timestamps were parsed once above): for each
+    # detection, searchsorted finds the end of its 5-second window, so the number
+    # of later detections inside it is that index minus its own position minus one
+    epochs = np.sort(np.fromiter((epoch for epoch, _ in detections_for_date), dtype=np.float64,
+                                 count=len(detections_for_date)))
+    nearby_counts = np.searchsorted(epochs, epochs + 5, side="right") - np.arange(len(epochs)) - 1
+    duplicate_indices = np.nonzero(nearby_counts > 0)[0]
     
-    if duplicate_groups:
-        print(f"    ⚠️  Found {len(duplicate_groups)} detection(s) that have others within 5 seconds:")
-        for det, nearby in duplicate_groups[:3]:  # Show first 3
-            ts = datetime.fromisoformat(det["timestamp"].replace('Z', '+00:00'))
-            ts_local = ts.astimezone(user_tz)
-            print(f"      {ts_local.strftime('%H:%M:%S')} has {len(nearby)} nearby detection(s)")
+    if len(duplicate_indices):
+        print(f"    ⚠️  Found {len(duplicate_indices)} detection(s) that have others within 5 seconds:")
+        for i in duplicate_indices[:3]:  # Show first 3
+            ts_local = datetime.fromtimestamp(float(epochs[i]), user_tz)
+            print(f"      {ts_local.strftime('%H:%M:%S')} has {nearby_counts[i]} nearby detection(s)")
 
 print(f"\n\n💡 Summary:")
 print(f"  - October 29: {len(by_date.get('2025-10-29', []))} detections stored")
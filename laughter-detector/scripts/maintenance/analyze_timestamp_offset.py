@@ -4,8 +4,15 @@ import os
 import sys
 from dotenv import load_dotenv
 from supabase import create_client
-from datetime import datetime
-import pytz
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+from pathlib import Path
+
+# Add project root to path so the shared src.utils helpers can be imported
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.timestamp_utils import parse_timestamp
 
 load_dotenv()
 supabase = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_ROLE_KEY'))
@@ -25,11 +32,11 @@ print("AUDIO SEGMENTS FOR NOV 6, 2025")
 print("=" * 80)
 
 # Nov 6 in PST = Nov 6 00:00 PST to Nov 7 00:00 PST = Nov 6 08:00 UTC to Nov 7 08:00 UTC
-pst = pytz.timezone('America/Los_Angeles')
-nov6_start_pst = pst.localize(datetime(2025, 11, 6, 0, 0, 0))
-nov6_end_pst = pst.localize(datetime(2025, 11, 7, 0, 0, 0))
-nov6_start_utc = nov6_start_pst.astimezone(pytz.UTC)
-nov6_end_utc = nov6_end_pst.astimezone(pytz.UTC)
+pst = ZoneInfo('America/Los_Angeles')
+nov6_start_pst = datetime(2025, 11, 6, 0, 0, 0, tzinfo=pst)
+nov6_end_pst = datetime(2025, 11, 7, 0, 0, 0, tzinfo=pst)
+nov6_start_utc = nov6_start_pst.astimezone(timezone.utc)
+nov6_end_utc = nov6_end_pst.astimezone(timezone.utc)
 
 print(f"\nNov 6 PST range: {nov6_start_pst.strftime('%Y-%m-%d %H:%M:%S %Z')} to {nov6_end_pst.strftime('%Y-%m-%d %H:%M:%S %Z')}")
 print(f"Nov 6 UTC range: {nov6_start_utc.strftime('%Y-%m-%d %H:%M:%S %Z')} to {nov6_end_utc.strftime('%Y-%m-%d %H:%M:%S %Z')}")
@@ -38,8 +45,8 @@ segments = supabase.table("audio_segments").select("id, start_time, end_time, da
 
 print(f"\nFound {len(segments.data)} audio segments:")
 for seg in segments.data:
-    start_utc = datetime.fromisoformat(seg['start_time'].replace('Z', '+00:00'))
-    end_utc = datetime.fromisoformat(seg['end_time'].replace('Z', '+00:00'))
+    start_utc = parse_timestamp(seg['start_time'])
+    end_utc = parse_timestamp(seg['end_time'])
     start_pst = start_utc.astimezone(pst)
     end_pst = end_utc.astimezone(pst)
     
@@ -57,7 +64,7 @@ dets = supabase.table("laughter_detections").select("id, timestamp").eq("user_id
 
 print(f"\nFirst 10 laughter detections:")
 for det in dets.data:
-    ts_utc = datetime.fromisoformat(det['timestamp'].replace('Z', '+00:00'))
+    ts_utc = parse_timestamp(det['timestamp'])
     ts_pst = ts_utc.astimezone(pst)
     
     print(f"  {ts_pst.strftime('%I:%M:%S %p %Z')} ({ts_utc.strftime('%H:%M:%S UTC')})")
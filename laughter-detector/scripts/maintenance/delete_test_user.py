@@ -27,20 +27,18 @@ if len(sys.argv) < 2:
 
 email = sys.argv[1].strip()
 
-# Find user in users table
-print(f"🔍 Looking up user: {email}")
-result = supabase.table("users").select("id, email").eq("email", email).execute()
+# Step 1: Delete from users table (cascading will handle related data)
+# DELETE returns the deleted row (email is UNIQUE), so the lookup and the delete
+# are one round trip - the id is read back for the auth delete below
+print(f"🔍 Looking up and deleting user: {email}")
+delete_result = supabase.table("users").delete().eq("email", email).execute()
 
-if not result.data:
+if not delete_result.data:
     print(f"❌ User not found in users table: {email}")
     exit(1)
 
-user_id = result.data[0]["id"]
+user_id = delete_result.data[0]["id"]
 print(f"✅ Found user ID: {user_id}")
-
-# Step 1: Delete from users table (cascading will handle related data)
-print(f"\n🗑️  Deleting from users table...")
-delete_result = supabase.table("users").delete().eq("id", user_id).execute()
 print(f"✅ Deleted from users table")
 
 # Step 2: Delete from Supabase Auth using admin API
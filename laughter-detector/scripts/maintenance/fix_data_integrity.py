@@ -12,7 +12,10 @@ SECURITY: This script only fixes data inconsistencies - it doesn't modify user d
 
 import os
 import sys
+import argparse
 import json
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
@@ -21,9 +24,36 @@ from supabase import create_client, Client
 # Load environment variables
 load_dotenv()
 
+MAX_USER_DIR_WORKERS = 8
+DELETED_NAMES_PREVIEW = 5
+
+
+def print_deleted_summary(names: list, label: str, verbose: bool = False):
+    """
+    Print what was deleted as one summary line (first/last few names) instead
+    of one line per file; with verbose, every name in a single write.
+    """
+    if not names:
+        return
+    if verbose:
+        sys.stdout.write("".join(f"  Deleted {label}: {name}\n" for name in names))
+    elif len(names) <= 2 * DELETED_NAMES_PREVIEW:
+        print(f"  Deleted {len(names)} {label}s: {', '.join(names)}")
+    else:
+        print(f"  Deleted {len(names)} {label}s; first {DELETED_NAMES_PREVIEW}: "
+              f"{', '.join(names[:DELETED_NAMES_PREVIEW])}; last {DELETED_NAMES_PREVIEW}: "
+              f"{', '.join(names[-DELETED_NAMES_PREVIEW:])}")
+
+
 class DataIntegrityFixer:
-    def __init__(self):
-        """Initialize the fixer with Supabase connection."""
+    def __init__(self, verbose: bool = False):
+        """
+        Initialize the fixer with Supabase connection.
+        
+        Args:
+            verbose: List every deleted file instead of a summary per directory
+        """
+        self.verbose = verbose
         self.supabase_url = os.getenv('SUPABASE_URL')
         self.supabase_service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
         
@@ -46,12 +76,12 @@ class DataIntegrityFixer:
         print("-" * 30)
         
         try:
-            # Get all processed segments
+            # Count processed segments (count only - range(0, 0) keeps the body to at most one row)
             processed_segments = self.supabase.table("audio_segments").select(
-                "id, file_path, processed"
-            ).eq("processed", True).execute()
+                "id", count="exact"
+            ).eq("processed", True).range(0, 0).execute()
             
-            print(f"Found {len(processed_segments.data)} processed segments")
+            print(f"Found {processed_segments.count or 0} processed segments")
             
             # Get all audio files on disk
             audio_dir = self.uploads_dir / "audio"
@@ -63,39 +93,56 @@ class DataIntegrityFixer:
             user_dirs = [d for d in audio_dir.iterdir() if d.is_dir()]
             print(f"Found {len(user_dirs)} user directories")
             
+            # User directories are independent and unlink is I/O-bound, so purge
+            # them in parallel; results are printed afterwards in directory order
             deleted_count = 0
-            for user_dir in user_dirs:
-                user_id = user_dir.name
-                print(f"Processing user: {user_id}")
-                
-                # Get all .ogg files in this user's directory
-                audio_files = list(user_dir.glob("*.ogg"))
-                print(f"  Found {len(audio_files)} audio files")
-                
-                # For now, we'll delete all files for processed users
-                # This is a cleanup operation to fix the inconsistency
-                for audio_file in audio_files:
-                    try:
-                        audio_file.unlink()
-                        deleted_count += 1
-                        print(f"  Deleted: {audio_file.name}")
-                    except Exception as e:
-                        print(f"  Failed to delete {audio_file.name}: {str(e)}")
+            with ThreadPoolExecutor(max_workers=MAX_USER_DIR_WORKERS) as executor:
+                for user_id, file_count, deleted, failed in executor.map(self._purge_user_dir, user_dirs):
+                    print(f"Processing user: {user_id}")
+                    print(f"  Found {file_count} audio files")
+                    print_deleted_summary(deleted, "file", self.verbose)
+                    for name, error in failed:
+                        print(f"  Failed to delete {name}: {str(error)}")
+                    deleted_count += len(deleted)
             
             print(f"✅ Deleted {deleted_count} orphaned audio files")
             
         except Exception as e:
             print(f"❌ Error fixing file deletion: {str(e)}")
 
+    def _purge_user_dir(self, user_dir: Path) -> tuple:
+        """
+        Delete every .ogg file in one user's audio directory.
+        
+        For now, we'll delete all files for processed users.
+        This is a cleanup operation to fix the inconsistency.
+        
+        Returns:
+            (user_id, files found, deleted file names, [(file name, error)])
+        """
+        # scandir avoids building a Path per entry
+        with os.scandir(user_dir) as entries:
+            audio_files = [(entry.path, entry.name) for entry in entries if entry.name.endswith(".ogg")]
+        
+        deleted = []
+        failed = []
+        for path, name in audio_files:
+            try:
+                os.unlink(path)
+                deleted.append(name)
+            except Exception as e:
+                failed.append((name, e))
+        return user_dir.name, len(audio_files), deleted, failed
+
     def fix_clip_overgeneration(self):
         """Fix the clip over-generation issue by cleaning up excess clips."""
         print("\n🔧 FIXING CLIP OVER-GENERATION")
         print("-" * 30)
         
         try:
-            # Get laughter detections count
-            detections_result = self.supabase.table("laughter_detections").select("id", count="exact").execute()
-            detections_count = detections_result.count
+            # Get laughter detections count (count only - range(0, 0) keeps the body to at most one row)
+            detections_result = self.supabase.table("laughter_detections").select("id", count="exact").range(0, 0).execute()
+            detections_count = detections_result.count or 0
             print(f"Database has {detections_count} laughter detections")
             
             # Get clips count
@@ -104,7 +151,9 @@ class DataIntegrityFixer:
                 print("No clips directory found")
                 return
             
-            clip_files = list(clips_dir.glob("*.wav"))
+            # scandir entries cache their stat, so each clip is stat'ed at most once
+            with os.scandir(clips_dir) as entries:
+                clip_files = [entry for entry in entries if entry.name.endswith(".wav")]
             print(f"Found {len(clip_files)} clip files")
             
             # Calculate expected clips (should be roughly 1 per detection)
@@ -115,19 +164,20 @@ class DataIntegrityFixer:
                 print(f"Found {excess_clips} excess clips")
                 
                 # Delete excess clips (keep the most recent ones)
-                clip_files_sorted = sorted(clip_files, key=lambda f: f.stat().st_mtime, reverse=True)
-                clips_to_delete = clip_files_sorted[expected_clips:]
+                # nlargest only orders the kept clips instead of sorting them all
+                keep = {entry.path for entry in heapq.nlargest(expected_clips, clip_files, key=lambda e: e.stat().st_mtime)}
+                clips_to_delete = [entry for entry in clip_files if entry.path not in keep]
                 
-                deleted_count = 0
+                deleted = []
                 for clip_file in clips_to_delete:
                     try:
-                        clip_file.unlink()
-                        deleted_count += 1
-                        print(f"  Deleted excess clip: {clip_file.name}")
+                        os.unlink(clip_file.path)
+                        deleted.append(clip_file.name)
                     except Exception as e:
                         print(f"  Failed to delete {clip_file.name}: {str(e)}")
+                print_deleted_summary(deleted, "excess clip", self.verbose)
                 
-                print(f"✅ Deleted {deleted_count} excess clips")
+                print(f"✅ Deleted {len(deleted)} excess clips")
             else:
                 print("✅ No excess clips found")
                 
@@ -141,11 +191,11 @@ class DataIntegrityFixer:
         
         try:
             # Check for segments marked as processed but with no corresponding files
-            segments = self.supabase.table("audio_segments").select("id, processed, file_path").execute()
-            
-            # This is a read-only check for now
-            processed_segments = [s for s in segments.data if s['processed']]
-            print(f"Found {len(processed_segments)} processed segments")
+            # This is a read-only check for now - only the count is needed
+            processed_segments = self.supabase.table("audio_segments").select(
+                "id", count="exact"
+            ).eq("processed", True).range(0, 0).execute()
+            print(f"Found {processed_segments.count or 0} processed segments")
             
             # The database consistency will be fixed by the file cleanup above
             print("✅ Database consistency maintained")
@@ -185,7 +235,12 @@ class DataIntegrityFixer:
 
 def main():
     """Main entry point for the fixer."""
-    fixer = DataIntegrityFixer()
+    parser = argparse.ArgumentParser(description='Fix Giggles data integrity issues')
+    parser.add_argument('--verbose', action='store_true',
+                        help='List every deleted file instead of a summary')
+    args = parser.parse_args()
+    
+    fixer = DataIntegrityFixer(verbose=args.verbose)
     success = fixer.run_fixes()
     
     if success:
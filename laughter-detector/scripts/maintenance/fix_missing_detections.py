@@ -8,8 +8,12 @@ but not stored in the database due to the manual processing bypass.
 """
 
 import os
+import re
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import chain, islice
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from src.auth.encryption import EncryptionService
@@ -21,6 +25,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Rows per laughter_detections INSERT request
+INSERT_BATCH_SIZE = 500
+
+# Concurrent single-row INSERTs when a batch has to be retried row by row
+MAX_INSERT_WORKERS = 8
+
+# Day the recovered clips were recorded (UTC); clip offsets are seconds from its midnight
+RECOVERY_DAY_START = datetime(2025, 10, 25, tzinfo=timezone.utc)
+
+# Clip filename: <segment base name>_laughter_<seconds into segment>.wav
+CLIP_RE = re.compile(r'^(.+)_laughter_(\d+(?:\.\d+)?)\.wav$')
+
 class MissingDetectionsFixer:
     def __init__(self):
         # Load environment variables
@@ -43,7 +59,9 @@ class MissingDetectionsFixer:
         # Check clips on disk
         clips_dir = "uploads/clips"
         if os.path.exists(clips_dir):
-            clips = [f for f in os.listdir(clips_dir) if f.endswith('.wav')]
+            # scandir skips directories via the cached d_type instead of a stat per entry
+            with os.scandir(clips_dir) as entries:
+                clips = [entry.name for entry in entries if entry.name.endswith('.wav') and entry.is_file()]
             logger.info(f"📁 Found {len(clips)} clips on disk")
             
             for clip in clips:
@@ -61,93 +79,132 @@ class MissingDetectionsFixer:
         
         return True
     
-    def extract_detection_info_from_clips(self):
-        """Extract detection information from clip filenames."""
+    def iter_detections(self):
+        """
+        Yield detection information parsed from clip filenames, one clip at a time.
+        
+        Clips are read lazily from the directory so memory stays flat however
+        many clips there are.
+        """
         logger.info("🔍 Extracting detection info from clips...")
         
         clips_dir = "uploads/clips"
         if not os.path.exists(clips_dir):
             logger.error("❌ Clips directory not found")
-            return []
-        
-        clips = [f for f in os.listdir(clips_dir) if f.endswith('.wav')]
-        detections = []
-        
-        for clip in clips:
-            # Parse filename: 20251025_001628-20251025_021628_laughter_410.wav
-            try:
-                parts = clip.replace('.wav', '').split('_laughter_')
-                if len(parts) == 2:
-                    base_name = parts[0]
-                    timestamp = float(parts[1])
-                    
-                    # Get audio segment ID from the base name
-                    audio_segments = self.supabase.table("audio_segments").select("*").execute()
-                    matching_segment = None
-                    
-                    for segment in audio_segments.data:
-                        # Decrypt and check if this clip belongs to this segment
-                        try:
-                            decrypted_path = self.encryption_service.decrypt(segment['file_path'])
-                            if base_name in decrypted_path:
-                                matching_segment = segment
-                                break
-                        except:
-                            continue
-                    
-                    if matching_segment:
-                        detection_info = {
-                            'clip_filename': clip,
-                            'timestamp': timestamp,
-                            'audio_segment_id': matching_segment['id'],
-                            'user_id': matching_segment['user_id'],
-                            'base_name': base_name
-                        }
-                        detections.append(detection_info)
-                        logger.info(f"   ✅ {clip} -> {timestamp}s (segment: {matching_segment['id']})")
-                    else:
-                        logger.warning(f"   ⚠️  Could not match {clip} to audio segment")
-                        
-            except Exception as e:
-                logger.error(f"   ❌ Error parsing {clip}: {str(e)}")
-        
-        return detections
+            return
+        
+        # Fetch the segments once for all clips (only the columns used below)
+        audio_segments = self.supabase.table("audio_segments").select("id, user_id, file_path").execute()
+        
+        # Decrypt every segment path once up front - each clip then looks up plaintext
+        # names instead of re-decrypting every segment (N*M decrypts -> M)
+        decrypted_paths = self.encryption_service.decrypt_many(
+            [segment['file_path'] for segment in audio_segments.data]
+        )
+        
+        # Index segments by file name without extension - the base name YAMNetProcessor
+        # puts in front of "_laughter_" in clip names (first segment wins on duplicates)
+        segments_by_base_name = {}
+        for decrypted_path, segment in zip(decrypted_paths, audio_segments.data):
+            if decrypted_path is not None:
+                segments_by_base_name.setdefault(os.path.splitext(os.path.basename(decrypted_path))[0], segment)
+        
+        # scandir skips directories via the cached d_type instead of a stat per entry
+        with os.scandir(clips_dir) as entries:
+            clips = (entry.name for entry in entries if entry.name.endswith('.wav') and entry.is_file())
+            for clip in clips:
+                # Parse filename: 20251025_001628-20251025_021628_laughter_410.wav
+                match = CLIP_RE.match(clip)
+                if not match:
+                    continue
+                base_name, timestamp = match.group(1), float(match.group(2))
+                
+                # Get audio segment ID from the base name
+                matching_segment = segments_by_base_name.get(base_name)
+                
+                if matching_segment:
+                    detection_info = {
+                        'clip_filename': clip,
+                        'timestamp': timestamp,
+                        'audio_segment_id': matching_segment['id'],
+                        'user_id': matching_segment['user_id'],
+                        'base_name': base_name
+                    }
+                    logger.info(f"   ✅ {clip} -> {timestamp}s (segment: {matching_segment['id']})")
+                    yield detection_info
+                else:
+                    logger.warning(f"   ⚠️  Could not match {clip} to audio segment")
     
     def store_missing_detections(self, detections):
-        """Store the missing laughter detections in the database."""
-        logger.info(f"💾 Storing {len(detections)} missing detections...")
+        """
+        Store the missing laughter detections in the database.
         
-        stored_count = 0
+        Args:
+            detections: Iterable of detection info dicts; consumed lazily,
+                INSERT_BATCH_SIZE at a time
         
-        for detection in detections:
-            try:
-                # Create the detection record
-                detection_data = {
-                    "user_id": detection['user_id'],
-                    "audio_segment_id": detection['audio_segment_id'],
-                    "timestamp": f"2025-10-25T{int(detection['timestamp']//3600):02d}:{int((detection['timestamp']%3600)//60):02d}:{int(detection['timestamp']%60):02d}.000000+00:00",
-                    "probability": 0.5,  # Default probability (we don't have the actual value)
-                    "clip_path": f"uploads/clips/{detection['clip_filename']}",
-                    "class_id": 137,  # Laughter class ID from YAMNet
-                    "class_name": "Laughter",
-                    "notes": "Recovered from manual processing"
-                }
-                
-                # Store in database
-                result = self.supabase.table("laughter_detections").insert(detection_data).execute()
-                
-                if result.data:
-                    logger.info(f"   ✅ Stored detection: {detection['clip_filename']}")
-                    stored_count += 1
-                else:
-                    logger.error(f"   ❌ Failed to store: {detection['clip_filename']}")
+        Returns:
+            Number of detections stored
+        """
+        logger.info(f"💾 Storing missing detections (batches of {INSERT_BATCH_SIZE})...")
+        
+        stored_count = 0
+        detections = iter(detections)
+        
+        # Store in database - one INSERT per batch instead of one per detection
+        while batch := list(islice(detections, INSERT_BATCH_SIZE)):
+            records = []  # (clip filename, row)
+            for detection in batch:
+                try:
+                    # Create the detection record
+                    detection_data = {
+                        "user_id": detection['user_id'],
+                        "audio_segment_id": detection['audio_segment_id'],
+                        "timestamp": (RECOVERY_DAY_START + timedelta(seconds=detection['timestamp'])).isoformat(timespec='microseconds'),
+                        "probability": 0.5,  # Default probability (we don't have the actual value)
+                        "clip_path": f"uploads/clips/{detection['clip_filename']}",
+                        "class_id": 137,  # Laughter class ID from YAMNet
+                        "class_name": "Laughter",
+                        "notes": "Recovered from manual processing"
+                    }
+                    
+                    records.append((detection['clip_filename'], detection_data))
                     
-            except Exception as e:
-                logger.error(f"   ❌ Error storing {detection['clip_filename']}: {str(e)}")
+                except Exception as e:
+                    logger.error(f"   ❌ Error storing {detection['clip_filename']}: {str(e)}")
+            
+            if records:
+                stored_count += self._insert_batch(records)
         
         logger.info(f"🎉 Successfully stored {stored_count} missing detections")
         return stored_count
     
+    def _insert_batch(self, records):
+        """
+        Insert a batch of (clip filename, row) records with one request.
+        
+        If the batch is rejected (e.g. one duplicate row), falls back to
+        inserting its rows individually (up to MAX_INSERT_WORKERS in flight)
+        so the rest are still stored and each failure is logged against its clip.
+        
+        Returns:
+            Number of rows stored
+        """
+        try:
+            result = self.supabase.table("laughter_detections").insert([row for _, row in records]).execute()
+            for clip_filename, _ in records:
+                logger.info(f"   ✅ Stored detection: {clip_filename}")
+            return len(result.data or [])
+        except Exception as e:
+            if len(records) == 1:
+                logger.error(f"   ❌ Error storing {records[0][0]}: {str(e)}")
+                return 0
+            logger.warning(f"   ⚠️  Batch insert failed ({str(e)}), retrying {len(records)} rows one at a time")
+        
+        # Retry the rows concurrently - each is its own round trip
+        with ThreadPoolExecutor(max_workers=min(MAX_INSERT_WORKERS, len(records))) as executor:
+            return sum(executor.map(lambda record: self._insert_batch([record]), records))
+    
     def run_fix(self):
         """Run the complete fix."""
         logger.info("🚀 Starting missing detections fix...")
@@ -160,15 +217,17 @@ class MissingDetectionsFixer:
         
         # Step 2: Extract detection info from clips
         logger.info("\n📋 Step 2: Extracting Detection Info")
-        detections = self.extract_detection_info_from_clips()
+        # Detections are streamed straight into the batched inserts below
+        detections = self.iter_detections()
+        first_detection = next(detections, None)
         
-        if not detections:
+        if first_detection is None:
             logger.warning("⚠️  No detections to store")
             return True
         
         # Step 3: Store missing detections
         logger.info("\n📋 Step 3: Storing Missing Detections")
-        stored_count = self.store_missing_detections(detections)
+        stored_count = self.store_missing_detections(chain([first_detection], detections))
         
         if stored_count > 0:
             logger.info(f"✅ Successfully stored {stored_count} missing detections")
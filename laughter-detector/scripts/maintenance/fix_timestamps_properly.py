@@ -4,11 +4,19 @@ Fix Timestamps Properly
 =======================
 
 This script fixes the incorrect timestamps for the recovered laughter detections.
+
+Usage:
+    python3 fix_timestamps_properly.py [--dry-run]
+
+Options:
+    --dry-run     Show the corrected timestamps without writing them
 """
 
 import os
 import sys
+import argparse
 import logging
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
@@ -19,8 +27,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Day the recovered clips were recorded (UTC); clip offsets are seconds from its midnight
+RECOVERY_DAY_START = datetime(2025, 10, 25, tzinfo=timezone.utc)
+
 class TimestampFixer:
-    def __init__(self):
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        
         # Load environment variables
         load_dotenv()
         
@@ -31,66 +44,99 @@ class TimestampFixer:
             raise Exception("Supabase credentials not found")
         
         self.supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
-        logger.info("🔧 Timestamp Fixer initialized")
+        logger.info(f"🔧 Timestamp Fixer initialized (dry_run={dry_run})")
     
     def fix_timestamps(self):
         """Fix the incorrect timestamps for recovered detections."""
         logger.info("🔍 Fixing timestamps for recovered detections...")
         
-        # Get all laughter detections
-        result = self.supabase.table("laughter_detections").select("*").execute()
+        # Get only the recovered detections, filtered in Postgres
+        # (case-insensitive: store_missing_detections writes "Recovered from manual processing")
+        result = self.supabase.table("laughter_detections").select(
+            "id, clip_path, timestamp"
+        ).ilike("notes", "%recovered from manual processing%").execute()
         
-        fixed_count = 0
+        updates = []  # (detection id, corrected timestamp)
         
         for detection in result.data:
-            if "recovered from manual processing" in detection.get("notes", ""):
-                logger.info(f"🔧 Fixing detection: {detection['id']}")
-                
-                # Parse the clip filename to get correct timestamp
-                clip_path = detection.get("clip_path", "")
-                if "laughter_" in clip_path:
-                    parts = clip_path.split("_laughter_")
-                    if len(parts) == 2:
-                        base_name = parts[0]
-                        laughter_seconds = float(parts[1].replace(".wav", ""))
-                        
-                        # Parse base name: uploads/clips/20251025_001628-20251025_021628
-                        # Extract the start time: 20251025_001628
-                        start_part = base_name.split("/")[-1].split("-")[0]  # 20251025_001628
-                        date_part, time_part = start_part.split("_")
-                        
-                        # Convert 001628 to seconds: 0*3600 + 16*60 + 28 = 988 seconds
-                        hours = int(time_part[:2])
-                        minutes = int(time_part[2:4])
-                        seconds = int(time_part[4:6])
-                        start_seconds = hours * 3600 + minutes * 60 + seconds
-                        
-                        # Calculate actual laughter time
-                        actual_seconds = start_seconds + laughter_seconds
-                        
-                        # Convert to proper timestamp
-                        actual_hours = int(actual_seconds // 3600)
-                        actual_minutes = int((actual_seconds % 3600) // 60)
-                        actual_secs = int(actual_seconds % 60)
-                        
-                        # Create proper timestamp
-                        corrected_timestamp = f"2025-10-25T{actual_hours:02d}:{actual_minutes:02d}:{actual_secs:02d}.000000+00:00"
-                        
-                        logger.info(f"  Original: {detection['timestamp']}")
-                        logger.info(f"  Corrected: {corrected_timestamp}")
-                        logger.info(f"  Laughter at: {actual_hours:02d}:{actual_minutes:02d}:{actual_secs:02d}")
-                        
-                        # Update the database
-                        self.supabase.table("laughter_detections").update({
-                            "timestamp": corrected_timestamp
-                        }).eq("id", detection["id"]).execute()
-                        
-                        logger.info(f"  ✅ Updated timestamp")
-                        fixed_count += 1
+            logger.info(f"🔧 Fixing detection: {detection['id']}")
+            
+            # Parse the clip filename to get correct timestamp
+            clip_path = detection.get("clip_path") or ""
+            if "laughter_" in clip_path:
+                parts = clip_path.split("_laughter_")
+                if len(parts) == 2:
+                    base_name = parts[0]
+                    laughter_seconds = float(parts[1].replace(".wav", ""))
+                    
+                    # Parse base name: uploads/clips/20251025_001628-20251025_021628
+                    # Extract the start time: 20251025_001628
+                    start_part = base_name.split("/")[-1].split("-")[0]  # 20251025_001628
+                    date_part, time_part = start_part.split("_")
+                    
+                    # Convert 001628 to seconds: 0*3600 + 16*60 + 28 = 988 seconds
+                    hours = int(time_part[:2])
+                    minutes = int(time_part[2:4])
+                    seconds = int(time_part[4:6])
+                    start_seconds = hours * 3600 + minutes * 60 + seconds
+                    
+                    # Calculate actual laughter time
+                    actual_seconds = start_seconds + laughter_seconds
+                    
+                    # Create proper timestamp
+                    laughter_at = RECOVERY_DAY_START + timedelta(seconds=actual_seconds)
+                    corrected_timestamp = laughter_at.isoformat(timespec='microseconds')
+                    
+                    logger.info(f"  Original: {detection['timestamp']}")
+                    logger.info(f"  Corrected: {corrected_timestamp}")
+                    logger.info(f"  Laughter at: {laughter_at:%H:%M:%S}")
+                    
+                    updates.append((detection["id"], corrected_timestamp))
+        
+        if self.dry_run:
+            logger.info(f"🔍 [DRY RUN] Would update {len(updates)} timestamps")
+            return len(updates)
+        
+        # Update the database - all corrected timestamps in one round trip
+        fixed_count = self.apply_timestamp_updates(updates)
         
         logger.info(f"🎉 Fixed {fixed_count} timestamps")
         return fixed_count
     
+    def apply_timestamp_updates(self, updates):
+        """
+        Write corrected timestamps back to laughter_detections.
+        
+        Uses the set_detection_timestamps RPC (scripts/setup/set_detection_timestamps.sql)
+        so every row is updated in one request. Falls back to one UPDATE per
+        row if the function is not installed.
+        
+        Args:
+            updates: List of (detection id, corrected timestamp) tuples
+            
+        Returns:
+            Number of rows updated
+        """
+        if not updates:
+            return 0
+        
+        try:
+            result = self.supabase.rpc("set_detection_timestamps", {
+                "ids": [detection_id for detection_id, _ in updates],
+                "timestamps": [timestamp for _, timestamp in updates],
+            }).execute()
+            logger.info(f"  ✅ Updated {result.data} timestamps")
+            return result.data or 0
+        except Exception as e:
+            logger.warning(f"⚠️  set_detection_timestamps RPC unavailable, updating rows one at a time: {str(e)}")
+        
+        for detection_id, timestamp in updates:
+            self.supabase.table("laughter_detections").update({
+                "timestamp": timestamp
+            }).eq("id", detection_id).execute()
+            logger.info(f"  ✅ Updated timestamp: {detection_id}")
+        return len(updates)
+    
     def run_fix(self):
         """Run the complete timestamp fix."""
         logger.info("🚀 Starting timestamp fix...")
@@ -98,15 +144,19 @@ class TimestampFixer:
         fixed_count = self.fix_timestamps()
         
         if fixed_count > 0:
-            logger.info(f"✅ Successfully fixed {fixed_count} timestamps")
+            logger.info(f"✅ {fixed_count} timestamps {'would be ' if self.dry_run else 'successfully '}fixed")
             return True
         else:
             logger.warning("⚠️  No timestamps were fixed")
             return False
 
 def main():
+    parser = argparse.ArgumentParser(description="Fix timestamps of recovered laughter detections")
+    parser.add_argument("--dry-run", action="store_true", help="Show corrected timestamps without writing them")
+    args = parser.parse_args()
+    
     try:
-        fixer = TimestampFixer()
+        fixer = TimestampFixer(dry_run=args.dry_run)
         success = fixer.run_fix()
         sys.exit(0 if success else 1)
     except Exception as e:
@@ -489,8 +489,7 @@ async def reprocess_date_range(
         # ALWAYS run orphan cleanup, even if processing failed
         # This ensures no orphaned files remain from crashed/failed processing
         try:
-            from datetime import timedelta
-            now_utc = datetime.utcnow()
+            now_utc = datetime.now(pytz.UTC)
             start_window = now_utc - timedelta(days=2)
             # Exclude clip paths created during reprocessing to prevent race condition
             session_clip_paths = all_stored_clip_paths if 'all_stored_clip_paths' in locals() else set()
@@ -0,0 +1,67 @@
+-- ==================================================
+-- AUDIO SEGMENTS PER DATE (server-side)
+-- ==================================================
+-- Used by scripts/diagnostics/check_user_processing_status.py so that one
+-- row per date crosses the wire instead of every audio segment.
+--
+-- audio_segments.date is already a calendar date in the user's timezone.
+
+CREATE OR REPLACE FUNCTION audio_segments_by_date(uid UUID)
+RETURNS TABLE (
+    date DATE,
+    segment_count BIGINT,
+    processed_count BIGINT,
+    total_s DOUBLE PRECISION
+) AS $$
+    SELECT
+        s.date,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE s.processed),
+        COALESCE(SUM(EXTRACT(EPOCH FROM s.end_time - s.start_time)), 0)::DOUBLE PRECISION
+    FROM public.audio_segments s
+    WHERE s.user_id = uid
+    GROUP BY s.date
+    ORDER BY s.date;
+$$ LANGUAGE sql STABLE;
+
+-- Uses idx_audio_segments_user_id (user_id)
+
+GRANT EXECUTE ON FUNCTION audio_segments_by_date(UUID) TO service_role;
+
+COMMENT ON FUNCTION audio_segments_by_date(UUID) IS
+'Segment count, processed count and recorded seconds per calendar date for one user';
+
+-- Several users in one round trip (check_user_processing_status.py with more
+-- than one user id): one row per (user, date).
+--
+-- Paged with row_limit/row_offset: PostgREST's max-rows cap (1000) also
+-- applies to RPC results, so several users with long histories would
+-- otherwise be cut off silently. (user_id, date) is unique, so the order is
+-- stable between pages.
+DROP FUNCTION IF EXISTS audio_segments_by_date_many(UUID[]);
+
+CREATE OR REPLACE FUNCTION audio_segments_by_date_many(uids UUID[], row_limit INT DEFAULT NULL, row_offset INT DEFAULT 0)
+RETURNS TABLE (
+    user_id UUID,
+    date DATE,
+    segment_count BIGINT,
+    processed_count BIGINT,
+    total_s DOUBLE PRECISION
+) AS $$
+    SELECT
+        s.user_id,
+        s.date,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE s.processed),
+        COALESCE(SUM(EXTRACT(EPOCH FROM s.end_time - s.start_time)), 0)::DOUBLE PRECISION
+    FROM public.audio_segments s
+    WHERE s.user_id = ANY(uids)
+    GROUP BY s.user_id, s.date
+    ORDER BY s.user_id, s.date
+    LIMIT row_limit OFFSET row_offset;
+$$ LANGUAGE sql STABLE;
+
+GRANT EXECUTE ON FUNCTION audio_segments_by_date_many(UUID[], INT, INT) TO service_role;
+
+COMMENT ON FUNCTION audio_segments_by_date_many(UUID[], INT, INT) IS
+'audio_segments_by_date() for each of several users, paged by row_limit/row_offset';
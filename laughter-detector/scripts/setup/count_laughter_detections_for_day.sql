@@ -0,0 +1,32 @@
+-- ==================================================
+-- PER-USER LAUGHTER COUNTS FOR A DAY (server-side)
+-- ==================================================
+-- Used by scripts/diagnostics/analyze_500_errors.py so that only one count
+-- per user crosses the wire instead of every detection row for the day.
+--
+-- target_date is a calendar date interpreted in each user's own timezone
+-- (same convention as processing_logs.date), so each user is counted over
+-- their local midnight-to-midnight range.
+--
+-- The join on user_id plus the local-day timestamp range relies on
+-- idx_laughter_detections_user_timestamp. That index is created by
+-- scripts/setup/fix_duplicate_prevention.sql, so apply that script first.
+
+CREATE OR REPLACE FUNCTION count_laughter_detections_for_day(target_date DATE)
+RETURNS TABLE (
+    user_id UUID,
+    detection_count BIGINT
+) AS $$
+    SELECT u.id, COUNT(ld.id)
+    FROM public.users u
+    JOIN public.laughter_detections ld
+      ON ld.user_id = u.id
+     AND ld.timestamp >= (target_date::timestamp AT TIME ZONE COALESCE(u.timezone, 'UTC'))
+     AND ld.timestamp < ((target_date + 1)::timestamp AT TIME ZONE COALESCE(u.timezone, 'UTC'))
+    GROUP BY u.id;
+$$ LANGUAGE sql STABLE;
+
+GRANT EXECUTE ON FUNCTION count_laughter_detections_for_day(DATE) TO service_role;
+
+COMMENT ON FUNCTION count_laughter_detections_for_day(DATE) IS
+'Number of laughter detections per user on a calendar date in that user''s timezone';
@@ -0,0 +1,40 @@
+-- ==================================================
+-- DUPLICATE LAUGHTER CANDIDATES (server-side)
+-- ==================================================
+-- Used by scripts/cleanup/cleanup_existing_duplicates.py so that only
+-- possible duplicates cross the wire instead of every laughter detection.
+--
+-- Returns each detection that has another detection for the same user
+-- within 5 seconds before or after it. Detections with no such neighbor can
+-- never be part of a duplicate window, so the script's window grouping gives
+-- the same result on this subset as on the full table.
+
+CREATE OR REPLACE FUNCTION find_laughter_dupes()
+RETURNS TABLE (
+    id UUID,
+    user_id UUID,
+    "timestamp" TIMESTAMPTZ,
+    probability DECIMAL,
+    clip_path TEXT,
+    created_at TIMESTAMPTZ
+) AS $$
+    SELECT c.id, c.user_id, c.timestamp, c.probability, c.clip_path, c.created_at
+    FROM (
+        SELECT
+            ld.*,
+            LAG(ld.timestamp) OVER w AS prev_timestamp,
+            LEAD(ld.timestamp) OVER w AS next_timestamp
+        FROM public.laughter_detections ld
+        WINDOW w AS (PARTITION BY ld.user_id ORDER BY ld.timestamp)
+    ) c
+    WHERE c.timestamp - c.prev_timestamp <= INTERVAL '5 seconds'
+       OR c.next_timestamp - c.timestamp <= INTERVAL '5 seconds'
+    ORDER BY c.user_id, c.timestamp;
+$$ LANGUAGE sql STABLE;
+
+-- Uses idx_laughter_detections_user_timestamp (user_id, timestamp) when present
+
+GRANT EXECUTE ON FUNCTION find_laughter_dupes() TO service_role;
+
+COMMENT ON FUNCTION find_laughter_dupes() IS
+'Laughter detections within 5 seconds of a neighbor for the same user (duplicate candidates)';
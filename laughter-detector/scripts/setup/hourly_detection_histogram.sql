@@ -0,0 +1,38 @@
+-- ==================================================
+-- LAUGHTER DETECTIONS PER UTC HOUR (server-side)
+-- ==================================================
+-- Used by scripts/diagnostics/compare_user_detections.py so that one
+-- (user, hour, n) row per hour crosses the wire instead of every detection.
+--
+-- start_ts/end_ts are a UTC range: start inclusive, end exclusive.
+--
+-- Requires scripts/setup/fix_duplicate_prevention.sql to be applied first: it
+-- creates idx_laughter_detections_user_timestamp, which serves the
+-- user_id = ANY(user_ids) + timestamp range filter below.
+
+CREATE OR REPLACE FUNCTION hourly_detection_histogram(
+    user_ids UUID[],
+    start_ts TIMESTAMPTZ,
+    end_ts TIMESTAMPTZ
+)
+RETURNS TABLE (
+    user_id UUID,
+    hour INT,
+    n BIGINT
+) AS $$
+    SELECT
+        ld.user_id,
+        EXTRACT(HOUR FROM ld.timestamp AT TIME ZONE 'UTC')::INT AS hour,
+        COUNT(*) AS n
+    FROM public.laughter_detections ld
+    WHERE ld.user_id = ANY(user_ids)
+      AND ld.timestamp >= start_ts
+      AND ld.timestamp < end_ts
+    GROUP BY 1, 2
+    ORDER BY 1, 2;
+$$ LANGUAGE sql STABLE;
+
+GRANT EXECUTE ON FUNCTION hourly_detection_histogram(UUID[], TIMESTAMPTZ, TIMESTAMPTZ) TO service_role;
+
+COMMENT ON FUNCTION hourly_detection_histogram(UUID[], TIMESTAMPTZ, TIMESTAMPTZ) IS
+'Number of laughter detections per UTC hour for each of several users within a UTC range';
@@ -0,0 +1,52 @@
+-- ==================================================
+-- PROCESSING LOGS WITH PRE-AGGREGATED API CALL STATUSES
+-- ==================================================
+-- Used by scripts/diagnostics/check_user_processing_status.py so that each
+-- log row carries a small {status_code: count} object instead of the full
+-- api_calls array (one JSON object per Limitless HTTP request).
+--
+-- A STORED generated column is not possible here: generation expressions
+-- cannot use set-returning functions such as jsonb_array_elements, so the
+-- aggregation lives in a view instead.
+--
+-- security_invoker (Postgres 15+) makes the view run with the caller's
+-- privileges, so the RLS policies on processing_logs still apply; without it
+-- the view would run as its owner and expose every user's logs. Access is
+-- also limited to service_role: new objects in public are otherwise granted
+-- to anon/authenticated (see GRANT ALL ON ALL TABLES in setup_database.sql).
+
+CREATE OR REPLACE VIEW public.processing_logs_api_summary
+WITH (security_invoker = true) AS
+SELECT
+    pl.id,
+    pl.user_id,
+    pl.date,
+    pl.status,
+    pl.message,
+    pl.trigger_type,
+    pl.processing_duration_seconds,
+    pl.audio_files_downloaded,
+    pl.laughter_events_found,
+    pl.duplicates_skipped,
+    pl.last_processed,
+    pl.error_details,
+    COALESCE(s.api_call_statuses, '{}'::jsonb) AS api_call_statuses
+FROM public.processing_logs pl
+LEFT JOIN LATERAL (
+    SELECT jsonb_object_agg(c.status, c.n) AS api_call_statuses
+    FROM (
+        SELECT COALESCE(call->>'status_code', 'unknown') AS status, COUNT(*) AS n
+        FROM jsonb_array_elements(
+            CASE WHEN jsonb_typeof(pl.api_calls) = 'array' THEN pl.api_calls ELSE '[]'::jsonb END
+        ) AS call
+        GROUP BY 1
+    ) c
+) s ON true;
+
+-- Filters on user_id/date push down to idx_processing_logs_user_id / idx_processing_logs_date
+
+REVOKE ALL ON public.processing_logs_api_summary FROM PUBLIC, anon, authenticated;
+GRANT SELECT ON public.processing_logs_api_summary TO service_role;
+
+COMMENT ON VIEW public.processing_logs_api_summary IS
+'processing_logs without the api_calls array; api_call_statuses maps HTTP status code to call count';
@@ -0,0 +1,27 @@
+-- ==================================================
+-- BULK TIMESTAMP UPDATE FOR LAUGHTER DETECTIONS
+-- ==================================================
+-- Used by scripts/maintenance/fix_timestamps_properly.py so that all
+-- corrected timestamps are written in one round trip instead of one
+-- UPDATE request per detection.
+--
+-- ids[i] gets timestamps[i]; both arrays must be the same length.
+-- An upsert on id is not used because PostgREST would send it as an
+-- INSERT ... ON CONFLICT, which needs every NOT NULL column in the payload.
+
+CREATE OR REPLACE FUNCTION set_detection_timestamps(ids UUID[], timestamps TIMESTAMPTZ[])
+RETURNS INTEGER AS $$
+    WITH updated AS (
+        UPDATE public.laughter_detections ld
+        SET timestamp = v.ts
+        FROM unnest(ids, timestamps) AS v(id, ts)
+        WHERE ld.id = v.id
+        RETURNING ld.id
+    )
+    SELECT COUNT(*)::INTEGER FROM updated;
+$$ LANGUAGE sql VOLATILE;
+
+GRANT EXECUTE ON FUNCTION set_detection_timestamps(UUID[], TIMESTAMPTZ[]) TO service_role;
+
+COMMENT ON FUNCTION set_detection_timestamps(UUID[], TIMESTAMPTZ[]) IS
+'Set laughter_detections.timestamp for each id to the timestamp at the same array position; returns rows updated';
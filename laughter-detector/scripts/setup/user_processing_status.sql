@@ -0,0 +1,70 @@
+-- ==================================================
+-- USER PROCESSING STATUS (server-side, one round trip)
+-- ==================================================
+-- Used by scripts/diagnostics/check_user_processing_status.py so that the
+-- user record, Limitless key counts, segment duration sums and per-day
+-- laughter counts come back in one JSON object instead of one request each.
+--
+-- d is an optional calendar date in the user's timezone (same convention as
+-- audio_segments.date / processing_logs.date); NULL means all dates.
+-- "user" is null when the user does not exist.
+
+CREATE OR REPLACE FUNCTION user_processing_status(uid UUID, d DATE DEFAULT NULL)
+RETURNS JSONB AS $$
+    WITH u AS (
+        SELECT id, email, COALESCE(timezone, 'UTC') AS timezone, is_active
+        FROM public.users
+        WHERE id = uid
+    ),
+    k AS (
+        SELECT COUNT(*) AS total_keys, COUNT(*) FILTER (WHERE is_active) AS active_keys
+        FROM public.limitless_keys
+        WHERE user_id = uid
+    ),
+    s AS (
+        SELECT
+            COALESCE(SUM(EXTRACT(EPOCH FROM end_time - start_time)), 0)::DOUBLE PRECISION AS total_s,
+            COALESCE(SUM(EXTRACT(EPOCH FROM end_time - start_time)) FILTER (WHERE processed), 0)::DOUBLE PRECISION AS processed_s,
+            COALESCE(SUM(EXTRACT(EPOCH FROM end_time - start_time)) FILTER (WHERE processed IS NOT TRUE), 0)::DOUBLE PRECISION AS unprocessed_s,
+            COUNT(*) AS total_count,
+            COUNT(*) FILTER (WHERE processed) AS processed_count
+        FROM public.audio_segments
+        WHERE user_id = uid
+          AND (d IS NULL OR date = d)
+    ),
+    det AS (
+        SELECT (ld.timestamp AT TIME ZONE u.timezone)::date AS day, COUNT(*) AS n
+        FROM public.laughter_detections ld
+        CROSS JOIN u
+        WHERE ld.user_id = uid
+          AND (d IS NULL OR (
+              ld.timestamp >= (d::timestamp AT TIME ZONE u.timezone)
+              AND ld.timestamp < ((d + 1)::timestamp AT TIME ZONE u.timezone)
+          ))
+        GROUP BY 1
+    )
+    SELECT jsonb_build_object(
+        'user', (SELECT to_jsonb(u) FROM u),
+        'keys', (SELECT to_jsonb(k) FROM k),
+        'segments', (SELECT to_jsonb(s) FROM s),
+        'detections_by_date', COALESCE((SELECT jsonb_object_agg(day::text, n) FROM det), '{}'::jsonb)
+    );
+$$ LANGUAGE sql STABLE;
+
+GRANT EXECUTE ON FUNCTION user_processing_status(UUID, DATE) TO service_role;
+
+COMMENT ON FUNCTION user_processing_status(UUID, DATE) IS
+'User info, Limitless key counts, segment duration sums and per-day laughter counts for one user';
+
+-- Several users in one round trip (check_user_processing_status.py with more
+-- than one user id). Returns one row per requested id, even unknown ones.
+CREATE OR REPLACE FUNCTION user_processing_status_many(uids UUID[], d DATE DEFAULT NULL)
+RETURNS TABLE (user_id UUID, status JSONB) AS $$
+    SELECT uid, user_processing_status(uid, d)
+    FROM unnest(uids) AS uid;
+$$ LANGUAGE sql STABLE;
+
+GRANT EXECUTE ON FUNCTION user_processing_status_many(UUID[], DATE) TO service_role;
+
+COMMENT ON FUNCTION user_processing_status_many(UUID[], DATE) IS
+'user_processing_status() for each of several users';
@@ -7,7 +7,7 @@ Limitless API keys with proper key derivation and secure deletion.
 
 import os
 import base64
-from typing import Optional
+from typing import List, Optional
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives import hashes
@@ -85,6 +85,33 @@ class EncryptionService:
         Raises:
             ValueError: If decryption fails or data is invalid
         """
+        # Create AESGCM cipher
+        return self._decrypt_with(AESGCM(self.key), encrypted_data, associated_data)
+    
+    def decrypt_many(self, encrypted_values: List[str], associated_data: Optional[bytes] = None) -> List[Optional[str]]:
+        """
+        Decrypt many values with a single AES-256-GCM cipher.
+        
+        Args:
+            encrypted_values: Base64 encoded encrypted data items
+            associated_data: Optional associated data for authentication
+            
+        Returns:
+            Decrypted plaintexts in input order, None for items that fail to decrypt
+        """
+        # One cipher (and key schedule) for the whole batch instead of one per item
+        aesgcm = AESGCM(self.key)
+        
+        plaintexts = []
+        for encrypted_data in encrypted_values:
+            try:
+                plaintexts.append(self._decrypt_with(aesgcm, encrypted_data, associated_data))
+            except ValueError:
+                plaintexts.append(None)
+        return plaintexts
+    
+    def _decrypt_with(self, aesgcm: AESGCM, encrypted_data: str, associated_data: Optional[bytes]) -> str:
+        """Decrypt one base64 nonce+ciphertext value with an existing cipher."""
         if not encrypted_data:
             raise ValueError("Encrypted data cannot be empty")
         
@@ -96,9 +123,6 @@ class EncryptionService:
             nonce = encrypted_bytes[:12]
             ciphertext = encrypted_bytes[12:]
             
-            # Create AESGCM cipher
-            aesgcm = AESGCM(self.key)
-            
             # Decrypt the data
             plaintext_bytes = aesgcm.decrypt(nonce, ciphertext, associated_data)
             
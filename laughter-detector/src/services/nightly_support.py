@@ -0,0 +1,92 @@
+"""
+Nightly Processing Support
+
+Helpers used by process_nightly_audio.py:
+- day-window constants and the per-user "yesterday" range
+- a queue that writes processing_logs rows in the background
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Tuple
+import pytz
+
+# Module-level constants so the per-user loop doesn't rebuild them each time
+UTC = pytz.UTC
+ONE_DAY = timedelta(days=1)
+TWO_DAYS = timedelta(days=2)
+
+
+def yesterday_range(user_timezone: str) -> Tuple[datetime, datetime, datetime, datetime]:
+    """
+    Calculate "yesterday" in the user's timezone and its UTC equivalent.
+
+    Example: If cron runs at 9 AM UTC and user is in PST (UTC-8):
+    - UTC time: 9:00 AM Jan 15
+    - PST time: 1:00 AM Jan 15 (previous day completed at midnight PST)
+    - "Yesterday" for user: Jan 14, 2025 PST (00:00 → 23:59 PST)
+
+    Args:
+        user_timezone: IANA timezone name (e.g. 'America/Los_Angeles')
+
+    Returns:
+        (start_local, end_local, start_utc, end_utc) - midnight to midnight
+    """
+    user_tz = pytz.timezone(user_timezone)
+    yesterday_in_user_tz = datetime.now(user_tz) - ONE_DAY
+
+    # Calculate day boundaries in user's timezone
+    start_of_yesterday = yesterday_in_user_tz.replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    end_of_yesterday = start_of_yesterday + ONE_DAY
+
+    # Convert to UTC for API calls (Limitless API uses UTC, database stores UTC)
+    return (
+        start_of_yesterday,
+        end_of_yesterday,
+        start_of_yesterday.astimezone(UTC),
+        end_of_yesterday.astimezone(UTC),
+    )
+
+
+class ProcessingLogQueue:
+    """
+    Saves processing logs in worker threads without blocking the next user.
+
+    save_to_database() blocks on the sync Supabase client, so each write gets
+    its own event loop in a thread. Queued writes are awaited by flush().
+    """
+
+    def __init__(self):
+        """Initialize an empty queue."""
+        self._pending: List[asyncio.Task] = []
+
+    def queue(self, enhanced_logger, status: str, message: str) -> None:
+        """
+        Start saving one user's processing log.
+
+        Must be called from a running event loop.
+
+        Args:
+            enhanced_logger: Logger holding this user's counters
+            status: processing_logs status to save (the nightly job passes 'completed')
+            message: Human-readable status message
+        """
+        self._pending.append(
+            asyncio.create_task(
+                asyncio.to_thread(
+                    asyncio.run, enhanced_logger.save_to_database(status, message)
+                )
+            )
+        )
+
+    async def flush(self) -> None:
+        """Wait for all queued processing_logs writes to finish."""
+        if not self._pending:
+            return
+        results = await asyncio.gather(*self._pending, return_exceptions=True)
+        self._pending.clear()
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"❌ Error saving processing log: {result}")
@@ -43,6 +43,9 @@ def _norm_iso(ts: str) -> str:
 
 
 DEFAULT_CHUNK_MINUTES = 30
+_UTC = pytz.UTC
+_ONE_DAY = timedelta(days=1)
+_TWO_DAYS = timedelta(days=2)
 VERBOSE_PROCESSING_LOGS = settings.verbose_processing_logs
 
 
@@ -183,7 +186,7 @@ class Scheduler:
         # Calculate next processing time
         next_processing = datetime.combine(now.date(), processing_time)
         if next_processing <= now:
-            next_processing += timedelta(days=1)
+            next_processing += _ONE_DAY
 
         # Wait until processing time
         wait_seconds = (next_processing - now).total_seconds()
@@ -369,8 +372,8 @@ class Scheduler:
             # CRITICAL FIX: Exclude clip paths created in this session to prevent race condition
             # where cleanup runs before database inserts are fully visible (read-after-write consistency,
             # connection pooling, etc.). This ensures newly created files are not deleted.
-            now_utc = datetime.utcnow()
-            start_window = now_utc - timedelta(days=2)
+            now_utc = datetime.now(_UTC)
+            start_window = now_utc - _TWO_DAYS
             await self._cleanup_orphaned_files(user_id, start_window, now_utc, exclude_clip_paths=all_stored_clip_paths)
 
         except Exception as e:
@@ -389,8 +392,8 @@ class Scheduler:
             # where cleanup runs before database inserts are fully visible. This ensures newly
             # created files are not deleted even if DB query doesn't see them yet.
             try:
-                now_utc = datetime.utcnow()
-                start_window = now_utc - timedelta(days=2)
+                now_utc = datetime.now(_UTC)
+                start_window = now_utc - _TWO_DAYS
                 # all_stored_clip_paths initialized before try block, safe to use here
                 await self._cleanup_orphaned_files(user_id, start_window, now_utc, exclude_clip_paths=all_stored_clip_paths)
             except Exception as cleanup_err:
@@ -1879,8 +1882,8 @@ class Scheduler:
             
             # Step 5: Orphan cleanup (exclude files created in this session)
             try:
-                now_utc = datetime.utcnow()
-                start_window = now_utc - timedelta(days=2)
+                now_utc = datetime.now(_UTC)
+                start_window = now_utc - _TWO_DAYS
                 await self._cleanup_orphaned_files(
                     user_id, start_window, now_utc, exclude_clip_paths=all_stored_clip_paths
                 )
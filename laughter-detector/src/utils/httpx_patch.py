@@ -6,6 +6,10 @@ Supabase's Python client still instantiates httpx clients using the deprecated
 in favour of ``proxies`` which causes a TypeError when the Supabase client is
 imported. This module patches the httpx initialisers at runtime to keep
 backwards compatibility without downgrading httpx globally.
+
+It also offers an opt-in patch that decodes response bodies with orjson,
+for bulk-read scripts where JSON parsing of large Supabase pages is a
+noticeable share of runtime.
 """
 
 from __future__ import annotations
@@ -59,3 +63,33 @@ def enable_proxy_keyword_compat() -> None:
     _patch_client_init()
     _patch_async_client_init()
 
+
+def enable_orjson_response_parsing() -> bool:
+    """
+    Make ``httpx.Response.json()`` decode with orjson when it is installed.
+
+    Not applied on package import - call it from scripts that page through
+    many large responses. Calls with keyword arguments (e.g. ``object_hook``)
+    still go through the stdlib decoder. Safe to call multiple times.
+
+    Returns:
+        True if orjson parsing is active, False if orjson is not installed.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return False
+
+    if getattr(httpx.Response.json, "_uses_orjson", False):
+        return True
+
+    original_json = httpx.Response.json
+
+    def orjson_json(self, **kwargs: Any) -> Any:
+        if kwargs:
+            return original_json(self, **kwargs)
+        return orjson.loads(self.content)
+
+    orjson_json._uses_orjson = True  # type: ignore[attr-defined]
+    httpx.Response.json = orjson_json  # type: ignore[assignment]
+    return True
@@ -0,0 +1,47 @@
+"""
+Utility helpers for parsing the ISO timestamps Supabase returns.
+
+Shared by scripts and tests so every caller parses TIMESTAMPTZ strings the
+same way instead of carrying its own copy of the 'Z'-suffix workaround.
+"""
+
+from __future__ import annotations
+
+import sys
+from datetime import datetime
+from functools import lru_cache
+
+# Supabase returns TIMESTAMPTZ values in UTC with one of these suffixes
+UTC_SUFFIXES = ("Z", "+00:00")
+
+
+# Python 3.11+ fromisoformat accepts a trailing 'Z' itself; older versions
+# need it rewritten - pick the parser once instead of branching per row
+if sys.version_info >= (3, 11):
+    parse_timestamp = datetime.fromisoformat
+else:
+    def parse_timestamp(value: str) -> datetime:
+        """
+        Parse an ISO timestamp, accepting a trailing 'Z' for UTC.
+
+        Args:
+            value: ISO 8601 timestamp string.
+
+        Returns:
+            Parsed datetime (timezone-aware when the string carries an offset).
+        """
+        return datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+
+
+@lru_cache(maxsize=None)
+def parse_epoch_seconds(value: str) -> float:
+    """
+    Parse an ISO timestamp to epoch seconds, once per distinct string.
+
+    Args:
+        value: ISO 8601 timestamp string (optionally 'Z'-suffixed).
+
+    Returns:
+        Seconds since the Unix epoch.
+    """
+    return parse_timestamp(value).timestamp()
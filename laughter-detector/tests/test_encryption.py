@@ -0,0 +1,77 @@
+"""
+Tests for encryption functionality.
+
+This module contains tests for batch decryption with EncryptionService.decrypt_many()
+and its shared single-item helper _decrypt_with().
+"""
+
+import pytest
+
+from src.auth.encryption import EncryptionService
+
+
+# 64 hex characters = 32 byte AES-256 key
+TEST_KEY_HEX = "0123456789abcdef" * 4
+
+
+class TestDecryptMany:
+    """Test cases for EncryptionService.decrypt_many()."""
+    
+    @pytest.fixture
+    def encryption_service(self):
+        """Create encryption service with a fixed test key."""
+        return EncryptionService(TEST_KEY_HEX)
+    
+    def test_decrypt_many_preserves_input_order(self, encryption_service):
+        """Test that plaintexts come back in the same order as the inputs."""
+        plaintexts = [f"segment_{i}.ogg" for i in range(20)]
+        encrypted = [encryption_service.encrypt(text) for text in plaintexts]
+        
+        assert encryption_service.decrypt_many(encrypted) == plaintexts
+        assert encryption_service.decrypt_many(list(reversed(encrypted))) == list(reversed(plaintexts))
+    
+    def test_decrypt_many_matches_decrypt(self, encryption_service):
+        """Test that every batch result matches decrypt() on the same item."""
+        associated_data = b"user-123"
+        encrypted = [
+            encryption_service.encrypt(text, associated_data)
+            for text in ["first", "sécond", "third with spaces", "x" * 1000]
+        ]
+        
+        results = encryption_service.decrypt_many(encrypted, associated_data)
+        
+        for encrypted_data, result in zip(encrypted, results):
+            assert result == encryption_service.decrypt(encrypted_data, associated_data)
+    
+    def test_decrypt_many_empty_list(self, encryption_service):
+        """Test that an empty batch returns an empty list."""
+        assert encryption_service.decrypt_many([]) == []
+    
+    def test_decrypt_many_bad_items_return_none(self, encryption_service):
+        """Test that empty or invalid items become None without breaking the batch."""
+        good_first = encryption_service.encrypt("first")
+        good_last = encryption_service.encrypt("last")
+        wrong_key = EncryptionService("f" * 64).encrypt("other key")
+        
+        results = encryption_service.decrypt_many([
+            good_first,
+            "",
+            "not-base64!!",
+            wrong_key,
+            good_last,
+        ])
+        
+        assert results == ["first", None, None, None, "last"]
+    
+    def test_decrypt_many_wrong_associated_data(self, encryption_service):
+        """Test that items fail to decrypt (None) when the associated data differs."""
+        encrypted = encryption_service.encrypt("secret", b"user-123")
+        
+        assert encryption_service.decrypt_many([encrypted], b"user-456") == [None]
+    
+    def test_decrypt_raises_where_decrypt_many_returns_none(self, encryption_service):
+        """Test that decrypt() still raises ValueError for items decrypt_many() skips."""
+        for bad_value in ["", "not-base64!!"]:
+            with pytest.raises(ValueError):
+                encryption_service.decrypt(bad_value)
+            assert encryption_service.decrypt_many([bad_value]) == [None]
@@ -0,0 +1,86 @@
+"""
+Tests for the httpx runtime patches.
+
+This module contains tests for enable_orjson_response_parsing(), the opt-in
+patch that decodes httpx response bodies with orjson.
+"""
+
+import json
+import sys
+from decimal import Decimal
+
+import httpx
+import pytest
+
+from src.utils.httpx_patch import enable_orjson_response_parsing
+
+
+SAMPLE_BODY = json.dumps({
+    "data": [
+        {"id": "a1", "count": 3, "score": 0.25, "note": "café", "processed": True, "clip": None},
+        {"id": "b2", "count": 0, "score": 1.5, "note": "", "processed": False, "clip": "x.wav"},
+    ],
+    "total": 2,
+}).encode("utf-8")
+
+
+@pytest.fixture
+def restore_response_json(monkeypatch):
+    """Undo the class-level patch after each test so other tests see stock httpx."""
+    monkeypatch.setattr(httpx.Response, "json", httpx.Response.json)
+
+
+class TestOrjsonResponseParsing:
+    """Test cases for enable_orjson_response_parsing()."""
+    
+    def test_matches_stdlib_decoding(self, restore_response_json):
+        """Test that patched json() returns the same objects as the stdlib decoder."""
+        pytest.importorskip("orjson")
+        
+        assert enable_orjson_response_parsing() is True
+        response = httpx.Response(200, content=SAMPLE_BODY)
+        
+        assert response.json() == json.loads(SAMPLE_BODY)
+    
+    def test_kwargs_use_stdlib_decoder(self, restore_response_json):
+        """Test that keyword arguments are passed through to the stdlib decoder."""
+        pytest.importorskip("orjson")
+        
+        enable_orjson_response_parsing()
+        response = httpx.Response(200, content=SAMPLE_BODY)
+        
+        result = response.json(parse_float=Decimal)
+        
+        assert result == json.loads(SAMPLE_BODY, parse_float=Decimal)
+        assert isinstance(result["data"][0]["score"], Decimal)
+    
+    def test_invalid_json_still_raises(self, restore_response_json):
+        """Test that an invalid body raises a ValueError like the stdlib decoder."""
+        pytest.importorskip("orjson")
+        
+        enable_orjson_response_parsing()
+        response = httpx.Response(200, content=b"not json")
+        
+        with pytest.raises(ValueError):
+            response.json()
+    
+    def test_noop_without_orjson(self, restore_response_json, monkeypatch):
+        """Test that nothing is patched when orjson is not installed."""
+        monkeypatch.setitem(sys.modules, "orjson", None)  # makes `import orjson` raise ImportError
+        original_json = httpx.Response.json
+        
+        assert enable_orjson_response_parsing() is False
+        assert httpx.Response.json is original_json
+        assert httpx.Response(200, content=SAMPLE_BODY).json() == json.loads(SAMPLE_BODY)
+    
+    def test_second_call_does_not_double_wrap(self, restore_response_json):
+        """Test that calling the patch twice keeps a single wrapper."""
+        pytest.importorskip("orjson")
+        
+        assert enable_orjson_response_parsing() is True
+        patched_json = httpx.Response.json
+        
+        assert enable_orjson_response_parsing() is True
+        
+        assert httpx.Response.json is patched_json
+        assert httpx.Response(200, content=SAMPLE_BODY).json() == json.loads(SAMPLE_BODY)
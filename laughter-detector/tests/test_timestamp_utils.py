@@ -0,0 +1,87 @@
+"""
+Tests for timestamp parsing utilities.
+
+This module contains tests for the shared helpers in src/utils/timestamp_utils.py
+that parse the ISO timestamps Supabase returns.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.utils.timestamp_utils import (
+    UTC_SUFFIXES,
+    parse_epoch_seconds,
+    parse_timestamp,
+)
+
+
+class TestParseTimestamp:
+    """Test cases for parse_timestamp()."""
+    
+    def test_z_and_offset_suffixes_are_equal(self):
+        """Test that 'Z' and '+00:00' parse to the same UTC instant."""
+        with_z = parse_timestamp("2025-11-06T08:30:00Z")
+        with_offset = parse_timestamp("2025-11-06T08:30:00+00:00")
+        
+        assert with_z == with_offset
+        assert with_z.utcoffset() == timedelta(0)
+        assert with_z == datetime(2025, 11, 6, 8, 30, tzinfo=timezone.utc)
+    
+    def test_fractional_seconds(self):
+        """Test that microsecond precision is kept."""
+        parsed = parse_timestamp("2025-10-25T00:16:28.123456Z")
+        
+        assert parsed.microsecond == 123456
+        assert parsed == datetime(2025, 10, 25, 0, 16, 28, 123456, tzinfo=timezone.utc)
+    
+    def test_non_utc_offset(self):
+        """Test that a non-UTC offset is preserved and compares by instant."""
+        parsed = parse_timestamp("2025-11-06T00:30:00-08:00")
+        
+        assert parsed.utcoffset() == timedelta(hours=-8)
+        assert parsed == parse_timestamp("2025-11-06T08:30:00Z")
+    
+    def test_invalid_string_raises(self):
+        """Test that a malformed timestamp raises ValueError."""
+        with pytest.raises(ValueError):
+            parse_timestamp("not a timestamp")
+    
+    def test_utc_suffixes(self):
+        """Test that UTC_SUFFIXES matches both suffixes Supabase returns."""
+        assert "2025-11-06T08:30:00Z".endswith(UTC_SUFFIXES)
+        assert "2025-11-06T08:30:00+00:00".endswith(UTC_SUFFIXES)
+        assert not "2025-11-06T00:30:00-08:00".endswith(UTC_SUFFIXES)
+
+
+class TestParseEpochSeconds:
+    """Test cases for parse_epoch_seconds()."""
+    
+    def test_epoch_seconds(self):
+        """Test conversion to seconds since the Unix epoch, for both suffixes."""
+        assert parse_epoch_seconds("1970-01-01T00:01:00Z") == 60.0
+        assert parse_epoch_seconds("1970-01-01T00:01:00+00:00") == 60.0
+    
+    def test_fractional_seconds(self):
+        """Test that fractional seconds survive the conversion."""
+        assert parse_epoch_seconds("1970-01-01T00:00:01.500000Z") == pytest.approx(1.5)
+    
+    def test_results_are_cached(self):
+        """Test that a repeated string is served from the cache."""
+        parse_epoch_seconds.cache_clear()
+        
+        first = parse_epoch_seconds("2025-11-06T08:30:00Z")
+        second = parse_epoch_seconds("2025-11-06T08:30:00Z")
+        info = parse_epoch_seconds.cache_info()
+        
+        assert first == second
+        assert info.hits == 1
+        assert info.misses == 1
+    
+    def test_invalid_string_raises(self):
+        """Test that a malformed timestamp raises ValueError (and is not cached)."""
+        parse_epoch_seconds.cache_clear()
+        
+        with pytest.raises(ValueError):
+            parse_epoch_seconds("not a timestamp")
+        assert parse_epoch_seconds.cache_info().currsize == 0